@@ -1 +1,10 @@
 __version__ = '0.7.5'
+
+# the in-process API is loaded on first use, so that importing the package (e.g. from setup.py) stays dependency-free
+ApiFunctions = ['parse_history', 'compute_version', 'compute_channels', 'generate_changelog', 'generate_release_notes', 'run']
+
+def __getattr__(name):
+    if name in ApiFunctions:
+        from . import api
+        return getattr(api, name)
+    raise AttributeError("module 'autoversion' has no attribute '{0}'".format(name))
@@ -0,0 +1,124 @@
+"""In-process API.
+
+Lets tools compute versions and changelogs without spawning `autoversion` processes. Histories can be
+given as text, a text stream, an iterable of history lines or an iterable of parsed `Commit` objects.
+"""
+
+import io
+import os
+import sys
+import semver
+from contextlib import redirect_stdout
+from docopt import docopt
+from .commands.base import Commit
+from .commands.chlog import ChangelogGenerator
+from .commands.columnar import CommitColumns
+from .commands.scopes import ScopeIndex
+from .commands.template import ChangelogTemplate
+
+def parse_history(history, dedupe=False, scopes=None):
+    """Parses a commit history, returns the list of commits.
+
+    With `dedupe`, merges, duplicated and cherry-picked commits are skipped and reverted commits cancelled.
+    With `scopes` (a list or a comma separated string), only the commits of these scopes are kept.
+    """
+    if isinstance(history, str):
+        commits = Commit.parseCommitHistory(io.StringIO(history))
+    elif hasattr(history, 'readline'):
+        commits = Commit.parseCommitHistory(history)
+    else:
+        items = list(history)
+        if all(isinstance(item, Commit) for item in items):
+            commits = items
+        else:
+            commits = Commit.parseCommitHistory(line if line.endswith('\n') else line + '\n' for line in items)
+    commits = Commit.deduplicateHistory(commits) if dedupe else commits
+    if scopes:
+        scopes = ScopeIndex.parseScopes(scopes) if isinstance(scopes, str) else scopes
+        commits = ScopeIndex.fromCommits(commits).select(commits, scopes)
+    return commits
+
+def parse_version(version):
+    if version is None or isinstance(version, semver.VersionInfo):
+        return version
+    return semver.VersionInfo.parse(version[1:] if version.startswith('v') else version)
+
+def parse_template(template):
+    if template is None or isinstance(template, ChangelogTemplate):
+        return template
+    return ChangelogTemplate(template)
+
+def compute_version(history, last='0.0.0'):
+    """Returns the current version (`semver.VersionInfo`) given the history since the `last` version."""
+    return CommitColumns.fromCommits(parse_history(history)).calculateCurrentVersion(parse_version(last))
+
+def compute_channels(history, last='0.0.0'):
+    """Returns the release, dev and build versions given the history since the `last` version."""
+    return Commit.calculateVersionChannels(parse_version(last), parse_history(history))
+
+def generate_changelog(history, changelog='', last=None, stream=None, template=None):
+    """Adds the versions of the history to a changelog.
+
+    `changelog` is the existing changelog markdown (text or stream). The result is a dict with the current
+    `version` and the updated `changelog` text, or None for the text if it was written to `stream`.
+    `template` is a `ChangelogTemplate` or a dict of template parts (header, version, section, entry).
+    """
+    changelogMd = changelog.read() if hasattr(changelog, 'read') else changelog
+    generator = ChangelogGenerator.fromChangelogMd(changelogMd, parse_version(last), template=parse_template(template))
+    if generator is None:
+        raise ValueError('could not parse the changelog')
+    if stream is not None:
+        generator.writeChangelog(stream, parse_history(history))
+        return {'version': generator.currentVersion, 'changelog': None}
+    text = generator.generateChangelog(parse_history(history))
+    return {'version': generator.currentVersion, 'changelog': text}
+
+def generate_release_notes(history, current, template=None):
+    """Returns the release notes (markdown) of the `current` version made by the history."""
+    return '\n'.join(ChangelogGenerator.generateReleaseNotes(parse_version(current), parse_history(history), parse_template(template)))
+
+def run(argv, stdin='', cwd=None, history_cache=None, stdin_encoding=None):
+    """Runs an `autoversion` command line in this process.
+
+    Returns a dict with the printed `output`, the exit `status` and an `error` message (or None).
+    `stdin` is text, or bytes (e.g. a compressed history) decoded with `stdin_encoding` (UTF-8 by default)
+    unless compressed. `history_cache` (see `HistoryCache`) serves parsed `--commit_hist` files.
+    """
+    from . import cli
+    from .commands.serve import Serve
+    output = io.StringIO()
+    status = 0
+    error = None
+    # commands resolve paths against the working directory and read '-' from stdin, so swap both for the call
+    previousStdin = sys.stdin
+    previousCwd = os.getcwd()
+    try:
+        os.chdir(cwd or previousCwd)
+        if isinstance(stdin, bytes):
+            sys.stdin = io.TextIOWrapper(io.BytesIO(stdin), encoding=stdin_encoding or 'utf-8')
+        else:
+            sys.stdin = io.StringIO(stdin)
+        with redirect_stdout(output):
+            options = docopt(cli.__doc__, argv=argv, version=cli.VERSION)
+            command = cli.findCommand(options)
+            if command is Serve:
+                raise ValueError('serve can not run in process')
+            if command:
+                kwargs = {}
+                if history_cache is not None and options['--commit_hist'] and not options['-']:
+                    path = os.path.abspath(options['--commit_hist'])
+                    kwargs['commitHistory'] = history_cache.get(path)
+                    if options['--scope'] and not options['--dedupe']:
+                        kwargs['scopeIndex'] = history_cache.getScopeIndex(path)
+                command(options, **kwargs).run()
+    except SystemExit as e: # docopt usage errors and --version
+        if isinstance(e.code, str):
+            status, error = 1, e.code
+        else:
+            status = e.code or 0
+    except Exception as e:
+        status, error = 1, '{0}: {1}'.format(type(e).__name__, e)
+    finally:
+        sys.stdin = previousStdin
+        os.chdir(previousCwd)
+    return {'output': output.getvalue(), 'status': status, 'error': error}
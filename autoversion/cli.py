@@ -2,51 +2,100 @@
 autoversion
 
 Usage:
-    autoversion current --last=<last_version> (--commit_hist=<commit_history_file> | -)
-    autoversion chlog [--last=<last_version>] [--chlog_file=<changelog_file>] [--noupdate] (--commit_hist=<commit_history_file> | -)
-    autoversion release --current=<current_version> (--commit_hist=<commit_history_file> | -)
+    autoversion current --last=<last_version> [--channels | --follow [--idle=<seconds>] [--terminator=<line>]] [--dedupe] [--scope=<scopes>] (--commit_hist=<commit_history_file> | --plastic=<branch> [--since=<changeset_id>] | -)
+    autoversion chlog [--last=<last_version>] [--chlog_file=<changelog_file>] [--noupdate | --check | --archive=<major_or_year> [--archive_keep=<count>]] [--template=<template_file>] [--dedupe] [--scope=<scopes>] (--commit_hist=<commit_history_file> | --plastic=<branch> [--since=<changeset_id>] | -)
+    autoversion release --current=<current_version> [--template=<template_file>] [--dedupe] [--scope=<scopes>] (--commit_hist=<commit_history_file> | --plastic=<branch> [--since=<changeset_id>] | -)
+    autoversion timeline [--last=<last_version>] [--save=<index_file>] [--dedupe] (--commit_hist=<commit_history_file> | --plastic=<branch> [--since=<changeset_id>] | -)
+    autoversion timeline --index=<index_file> [--query=<hash_or_date>] [-]
+    autoversion scopes [--dedupe] (--commit_hist=<commit_history_file> | --plastic=<branch> [--since=<changeset_id>] | -)
+    autoversion serve [--socket=<socket_path>]
     autoversion --version
 
 Arguments:
     current     Calculate current version based on commit history and last version
     chlog       Generate changelog for the current version (if CHANGELOG.md exists) and all versions (otherwise)
+    timeline    Build (or query) an index of the version each commit was released in
+    scopes      List the scopes of the commit history with their number of commits
+    serve       Serve commands from a long-running process (JSON-RPC over a Unix socket or stdin/stdout)
 
 Options:
     --last=<last_version>                The last version
     --current=<current_version>          The current version
     --commit_hist=<commit_history_file>  The commit history file
+    --plastic=<branch>                   Read the history of a PlasticSCM branch with `cm find` (AUTOVERSION_CM overrides `cm`)
+    --since=<changeset_id>               Only read the changesets after this one
     --chlog_file=<changelog_file>        The existing changelog file
     --noupdate                           Don't update the changelog file (print to stdout)
+    --check                              Check that the changelog has up to date sections for the history (exit 1 if not)
+    --archive=<major_or_year>            Move older versions to per-major (major) or per-year (year) archive files
+    --archive_keep=<count>               Number of latest majors/years kept in the changelog [default: 1]
+    --template=<template_file>           JSON file with the header, version, section and entry templates of the changelog
+    --channels                           Print release, prerelease (dev) and build versions as JSON
+    --follow                             Read an unbounded history, print "<hash> <version>" for every commit
+    --idle=<seconds>                     Complete a pending commit after this many seconds without input
+    --terminator=<line>                  Line that completes a pending commit (e.g. --terminator=%%)
+    --save=<index_file>                  Save the version timeline index to a file
+    --index=<index_file>                 The saved version timeline index to query
+    --query=<hash_or_date>               Commit hash or date (YYYY-MM-DD [HH:MM:SS]) to look up
+    --dedupe                             Skip merges, duplicated and cherry-picked commits, cancel reverted commits
+    --scope=<scopes>                     Only use the commits of these (comma separated) scopes
+    --socket=<socket_path>               The Unix socket to serve on (stdin/stdout if omitted)
     -                                    Read from stdin
     --version                            Show version
 
 Examples:
     autoversion current --last=0.0.1 --commit_hist=commit_history.txt
+    autoversion current --last=0.0.1 --channels --commit_hist=commit_history.txt
     autoversion chlog --commit_hist=commit_history.txt
     autoversion chlog --chlog_file=docs/CHANGELOG.md --commit_hist=commit_history.txt
+    autoversion chlog --check --commit_hist=commit_history.txt
+    autoversion chlog --archive=major --archive_keep=2 --commit_hist=commit_history.txt
+    autoversion release --current=1.2.0 --template=changelog_template.json --commit_hist=commit_history.txt
     git log --reverse --pretty="format:%h %s" | autoversion current --last=0.0.1 -
+    tail -f commits.log | autoversion current --last=0.0.1 --follow --idle=0.5 -
     git log --reverse --date="format:%m/%d/%Y %I:%M:%S %p" --pretty="format:%h %ad %s"| autoversion current --last=0.0.1 -
     cm find changeset "where branch='/main'" --format="{changesetid} {date} {comment}" --nototal | autoversion current --last=2.2.1 -
     cm find changeset "where branch='/main'" --format="{changesetid} {date} {comment}" --nototal | autoversion chlog -
+    autoversion current --last=2.2.1 --plastic=/main --since=1200
+    autoversion current --last=0.0.1 --scope=api,lang --commit_hist=commit_history.txt
+    autoversion scopes --commit_hist=commit_history.txt
+    autoversion timeline --last=0.0.1 --save=timeline.json --commit_hist=commit_history.txt
+    autoversion timeline --index=timeline.json --query=2022-09-06
+    autoversion serve --socket=/tmp/autoversion.sock &
+    AUTOVERSION_SOCKET=/tmp/autoversion.sock autoversion current --last=0.0.1 --commit_hist=commit_history.txt
 """ 
 
 from docopt import docopt
 import semver
 import sys
+import os
 
 from inspect import getmembers, isclass
 from . import __version__ as VERSION
 
-def main():
-    """Main CLI entrypoint."""
+def findCommand(options):
+    """Returns the command class selected by the parsed options."""
     import autoversion.commands
-    options = docopt(__doc__, version=VERSION)
-
     for (k, v) in options.items():
         if hasattr(autoversion.commands, k) and v:
             module = getattr(autoversion.commands, k)
             commands = getmembers(module, isclass)
-            command = [(name,cls) for (name,cls) in commands if name.lower() == k][0][1]
-            autoversion.commands = commands
-            command = command(options)
-            command.run()
+            return [(name,cls) for (name,cls) in commands if name.lower() == k][0][1]
+    return None
+
+def main():
+    """Main CLI entrypoint."""
+    # forward to a running `autoversion serve` instead of parsing the history in this process;
+    # followed histories never end, so they can't be sent in one request
+    socketPath = os.environ.get('AUTOVERSION_SOCKET')
+    if socketPath and sys.argv[1:2] != ['serve'] and '--follow' not in sys.argv:
+        from .client import forward
+        status = forward(socketPath, sys.argv[1:])
+        if status is not None:
+            sys.exit(status)
+
+    options = docopt(__doc__, version=VERSION)
+    command = findCommand(options)
+    if command:
+        command = command(options)
+        command.run()
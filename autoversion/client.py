@@ -0,0 +1,46 @@
+"""Thin client for `autoversion serve`."""
+
+import os
+import sys
+import json
+import base64
+import socket
+
+def request(sock, method, params, requestId=1):
+    """Sends one JSON-RPC request over a connected socket and returns the decoded response."""
+    message = {'jsonrpc': '2.0', 'id': requestId, 'method': method, 'params': params}
+    sock.sendall((json.dumps(message) + '\n').encode('utf-8'))
+    with sock.makefile('r', encoding='utf-8') as f:
+        return json.loads(f.readline())
+
+def forward(socketPath, argv):
+    """Runs the command line on the server and prints its output.
+
+    Returns the exit status, or None if the server is not reachable (the caller runs the command locally then).
+    """
+    if not hasattr(socket, 'AF_UNIX'):
+        return None
+    try:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(socketPath)
+    except OSError:
+        return None
+    params = {'argv': argv, 'cwd': os.getcwd()}
+    if '-' in argv:
+        # sent as bytes, so that compressed histories survive; text is decoded with the client's encoding
+        stdin = getattr(sys.stdin, 'buffer', None)
+        if stdin is None:
+            params['stdin'] = sys.stdin.read()
+        else:
+            params['stdin_b64'] = base64.b64encode(stdin.read()).decode('ascii')
+            params['stdin_encoding'] = sys.stdin.encoding
+    with sock:
+        response = request(sock, 'run', params)
+    if 'error' in response:
+        sys.stderr.write(response['error']['message'] + '\n')
+        return 1
+    result = response['result']
+    sys.stdout.write(result['output'])
+    if result.get('error'):
+        sys.stderr.write(result['error'] + '\n')
+    return result['status']
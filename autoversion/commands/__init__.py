@@ -1,4 +1,9 @@
 from .base import *
 from .current import *
 from .chlog import *
-from .release import *
\ No newline at end of file
+from .release import *
+from .timeline import *
+from .serve import *
+from .columnar import *
+from .template import *
+from .scopes import *
\ No newline at end of file
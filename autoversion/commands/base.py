@@ -1,9 +1,17 @@
 """The base command."""
 
+import io
 import sys
 import semver
 import re
 import datetime
+import hashlib
+import bisect
+import gzip
+import lzma
+import bz2
+import queue
+import threading
 from json import dumps
 from enum import Enum
 
@@ -56,6 +64,12 @@ class Commit:
         r"(?P<footer>(?<=\n)(?:(?P<footer_token>[\w\s-]+): (?P<footer_value>[\w `\"#-]+))+|$)",
         re.MULTILINE
     )
+    CompressedFormats = [(b'\x1f\x8b', gzip.open), (b'\xfd7zXZ\x00', lzma.open), (b'BZh', bz2.open)]
+    ReadBufferSize = 1024 * 1024
+    RevertRegex = re.compile(r'This reverts commit (?P<hash>[0-9a-fA-F]+)')
+    HashRegex = re.compile(r'^[0-9a-fA-F]+$')
+    CherryPickRegex = re.compile(r'^\(cherry picked from commit [0-9a-fA-F]+\)$', re.MULTILINE)
+    MinHashPrefix = 4 # shortest abbreviated hash matched against longer history hashes
     HistoryLineRegex = re.compile(r'^(?P<hash>[a-fA-F0-9]+) (?P<date>\d{1,2}/\d{1,2}/\d{4} \d{1,2}:\d{2}:\d{2} (A|P)M) (?P<description>(?:.|\n)+)$', re.MULTILINE)
 
     def __init__(self, commitHash, commitType, commitScope, commitSummary, commitBody, commitFooter, isInitial = False,
@@ -80,13 +94,22 @@ class Commit:
     def isVersionCommit(self):
         return self.typeEnum in [CommitType.Feature, CommitType.Fix] or self.isBreaking
 
-    def toChangelogListEntry(self, skipBody):
-        entry = '{0}'.format(self.summary) if skipBody or len(self.body) == 0 else '{0}\n\n{1}\n'.format(self.summary, self.body)
-        if self.scope:
-            entry = '**{0}:** {1}'.format(self.scope, entry)
-        if self.isBreaking and self.footerValue:
-            entry = '{0}\n\n{1}'.format(entry, self.footerValue)
-        return entry
+    def getDigest(self):
+        # identifies the change regardless of its hash, so cherry-picks and re-imports share a digest; the body tells
+        # unrelated commits with the same summary apart (without the note `git cherry-pick -x` adds to it)
+        body = Commit.CherryPickRegex.sub('', self.body)
+        normalized = '\x1f'.join([self.type or '', self.scope or '', ' '.join(self.summary.lower().split()), ' '.join(body.lower().split()),
+            ' '.join((self.footerValue or '').lower().split()), '!' if self.isBreaking else ''])
+        return hashlib.blake2b(normalized.encode('utf-8'), digest_size=8).digest()
+
+    def getRevertedHashes(self):
+        # `This reverts commit <hash>.` in the body or a `Refs: <hash>, <hash>` footer
+        hashes = Commit.RevertRegex.findall(self.body)
+        for line in self.footer.splitlines():
+            token, _, value = line.partition(':')
+            if token.strip() == 'Refs':
+                hashes.extend(ref.strip() for ref in value.split(',') if Commit.HashRegex.match(ref.strip()))
+        return hashes
 
     def getDateStr(self):
         return self.date.strftime('%Y-%m-%d') if self.date else ''
@@ -110,57 +133,215 @@ class Commit:
             return Commit('', commitType, commitScope, commitSummary, commitBody, commitFooter, isInitial, isMerge, isBreaking, commitFooterToken, commitFooterValue)
         return None
 
+    @classmethod
+    def openCommitHistory(cls, source, encoding = None):
+        """Opens a history file path or binary stream as text, decompressing gzip, xz and bz2 input on the fly.
+
+        Uncompressed input is decoded with `encoding` (UTF-8 by default), compressed input as UTF-8.
+        """
+        if isinstance(source, io.TextIOBase):
+            return source
+        stream = open(source, 'rb', buffering=cls.ReadBufferSize) if isinstance(source, str) else source
+        if not hasattr(stream, 'peek'):
+            stream = io.BufferedReader(stream, cls.ReadBufferSize)
+        opener = cls.detectCompression(stream.peek(6))
+        if opener is not None:
+            # decompress in large blocks rather than line by line
+            stream = io.BufferedReader(opener(stream, 'rb'), cls.ReadBufferSize)
+            encoding = 'utf-8'
+        return io.TextIOWrapper(stream, encoding=encoding or 'utf-8')
+
+    @classmethod
+    def detectCompression(cls, header):
+        for magic, opener in cls.CompressedFormats:
+            if header.startswith(magic):
+                return opener
+        return None
+
     @classmethod
     def parseCommitHistory(cls, stream):
-        commitHist = []
+        lines = iter(stream.readline, '') if hasattr(stream, 'readline') else stream
+        return list(cls.iterCommitHistory(lines))
+
+    @classmethod
+    def iterCommitHistory(cls, lines, terminator = None):
+        """Yields commits as soon as their history record is complete.
+
+        A record ends at the next header line, at a `terminator` line, at a None item (flush) or at the end of lines.
+        """
         lastCommitId = ''
-        lastCommitLine = ''
-        for line in iter(stream.readline, ''):
+        lastCommitDate = None
+        lastCommitLine = None # None outside of a record
+        for line in lines:
+            if line is None or (terminator is not None and line.rstrip('\r\n') == terminator):
+                commit = cls.parseHistoryRecord(lastCommitId, lastCommitDate, lastCommitLine)
+                if commit is not None:
+                    yield commit
+                lastCommitLine = None
+                continue
             match = cls.HistoryLineRegex.match(line)
             if match:
-                if len(lastCommitLine):
-                    # print('>>> parse commit: ' + repr(lastCommitLine))
-                    commit = Commit.parseCommit(lastCommitLine)
-                    if commit is not None:
-                        commit.hash = lastCommitId
-                        commit.date = lastCommitDate
-                        commitHist.append(commit)
-                    else:
-                        # print('>>> discard commit line: ' + lastCommitLine)
-                        pass
-                    lastCommitLine = ''
+                commit = cls.parseHistoryRecord(lastCommitId, lastCommitDate, lastCommitLine)
+                if commit is not None:
+                    yield commit
                 lastCommitId = match.group('hash')
                 lastCommitDate = datetime.datetime.strptime(match.group('date'), '%m/%d/%Y %I:%M:%S %p')
                 lastCommitLine = match.group('description')
                 # print('>>> commit decrption: ' + repr(lastCommitLine))
-            else:
+            elif lastCommitLine is not None:
                 lastCommitLine += line
         # finalize last commit
-        if len(lastCommitLine):
-            commit = Commit.parseCommit(lastCommitLine)
-            if commit is not None:
-                commit.hash = lastCommitId
-                commit.date = lastCommitDate
-                commitHist.append(commit)
-            else:
-                # print('>>> discard commit line: ' + lastCommitLine)
-                pass
-        return commitHist
+        commit = cls.parseHistoryRecord(lastCommitId, lastCommitDate, lastCommitLine)
+        if commit is not None:
+            yield commit
+
+    @classmethod
+    def parseHistoryRecord(cls, commitId, commitDate, commitLine):
+        if not commitLine:
+            return None
+        # print('>>> parse commit: ' + repr(commitLine))
+        commit = Commit.parseCommit(commitLine)
+        if commit is not None:
+            commit.hash = commitId
+            commit.date = commitDate
+        # else:
+            # print('>>> discard commit line: ' + commitLine)
+        return commit
+
+    @classmethod
+    def followCommitHistory(cls, stream, idleTimeout = None, terminator = None):
+        """Yields commits from an unbounded stream, flushing a pending record after `idleTimeout` seconds without input."""
+        if idleTimeout is None:
+            return cls.iterCommitHistory(iter(stream.readline, ''), terminator)
+        lines = queue.Queue()
+        def readLines():
+            for line in iter(stream.readline, ''):
+                lines.put(line)
+            lines.put('')
+        threading.Thread(target=readLines, daemon=True).start()
+        def linesWithFlush():
+            pending = False
+            while True:
+                try:
+                    line = lines.get(timeout=idleTimeout) if pending else lines.get()
+                except queue.Empty:
+                    pending = False
+                    yield None
+                    continue
+                if line == '':
+                    return
+                pending = True
+                yield line
+        return cls.iterCommitHistory(linesWithFlush(), terminator)
+
+    @classmethod
+    def iterUniqueCommits(cls, commits):
+        """Skips merge commits and commits seen before, by hash or by type/scope/summary digest."""
+        seenHashes = set()
+        seenDigests = set()
+        for commit in commits:
+            if commit.isMerge or (commit.hash and commit.hash in seenHashes):
+                continue
+            digest = commit.getDigest()
+            if digest in seenDigests:
+                continue
+            if commit.hash:
+                seenHashes.add(commit.hash)
+            seenDigests.add(digest)
+            yield commit
+
+    @classmethod
+    def cancelReverts(cls, commits):
+        """Drops revert commits together with the earlier commits they revert."""
+        positions = {commit.hash: idx for idx, commit in enumerate(commits) if commit.hash}
+        hashLengths = set(len(commitHash) for commitHash in positions)
+        cancelled = set()
+        revertedBy = {} # revert commit position -> reverted commit position
+        sortedHashes = None # for prefix lookups of short references, sorted on first use
+        for idx, commit in enumerate(commits):
+            if commit.typeEnum != CommitType.Revert:
+                continue
+            for revertedHash in commit.getRevertedHashes():
+                # references may be longer (or shorter) than the hashes in the history
+                target = positions.get(revertedHash)
+                if target is None:
+                    target = next((positions[revertedHash[:length]] for length in hashLengths if revertedHash[:length] in positions), None)
+                if target is None and len(revertedHash) >= cls.MinHashPrefix:
+                    if sortedHashes is None:
+                        sortedHashes = sorted(positions)
+                    target = cls.findHashPrefix(sortedHashes, positions, revertedHash, idx)
+                if target is None or target >= idx or target in cancelled and target not in revertedBy:
+                    continue
+                if target in revertedBy: # revert of a revert restores the original commit
+                    cancelled.discard(revertedBy.pop(target))
+                cancelled.update([target, idx])
+                revertedBy[idx] = target
+                break
+        return [commit for idx, commit in enumerate(commits) if idx not in cancelled]
+
+    @classmethod
+    def findHashPrefix(cls, sortedHashes, positions, prefix, before):
+        """Position of the only commit before `before` whose hash starts with `prefix`, or None (none or ambiguous)."""
+        targets = []
+        for idx in range(bisect.bisect_left(sortedHashes, prefix), len(sortedHashes)):
+            if not sortedHashes[idx].startswith(prefix):
+                break
+            if positions[sortedHashes[idx]] < before:
+                targets.append(positions[sortedHashes[idx]])
+        return targets[0] if len(targets) == 1 else None
+
+    @classmethod
+    def deduplicateHistory(cls, commits):
+        return cls.cancelReverts(list(cls.iterUniqueCommits(commits)))
 
     @classmethod
     def calculateCurrentVersion(cls, lastVersion, commitHistory, commitProcessedCb = None):
+        return cls.calculateVersionChannels(lastVersion, commitHistory, commitProcessedCb)['release']
+
+    @classmethod
+    def calculateVersionChannels(cls, lastVersion, commitHistory, commitProcessedCb = None):
         currentVersion = lastVersion
+        commitsSinceBump = 0
+        lastCommit = None
         for commit in commitHistory:
             if commit.isBreaking:
                 currentVersion = currentVersion.bump_major()
+                commitsSinceBump = 0
             elif commit.type == 'feat':
                 currentVersion = currentVersion.bump_minor()
+                commitsSinceBump = 0
             elif commit.type == 'fix':
                 currentVersion = currentVersion.bump_patch()
+                commitsSinceBump = 0
+            else:
+                commitsSinceBump += 1
+            lastCommit = commit
             if commitProcessedCb:
                 commitProcessedCb(currentVersion, commit)
-        currentVersion = currentVersion.finalize_version()
-        return currentVersion
+        return cls.versionChannels(currentVersion.finalize_version(), commitsSinceBump, lastCommit)
+
+    @classmethod
+    def versionChannels(cls, releaseVersion, commitsSinceBump, lastCommit):
+        # commits after the last bump go into the next version at the earliest, so the dev prerelease is one of the
+        # next patch (it sorts after the release it follows) and counts the commits since the bump;
+        # build metadata identifies the last commit
+        buildMetadata = cls.buildMetadata(lastCommit)
+        return {
+            'release': releaseVersion,
+            'dev': releaseVersion.bump_patch().replace(prerelease='dev.{0}'.format(commitsSinceBump)),
+            'build': releaseVersion.replace(build=buildMetadata) if buildMetadata else releaseVersion
+        }
+
+    @classmethod
+    def buildMetadata(cls, commit):
+        if commit is None:
+            return None
+        identifiers = []
+        if commit.hash:
+            identifiers.append(re.sub(r'[^0-9A-Za-z-]', '-', commit.hash))
+        if commit.date:
+            identifiers.append(commit.date.strftime('%Y%m%d%H%M'))
+        return '.'.join(identifiers) if identifiers else None
 
 class Base(object):
     """A base command."""
@@ -178,7 +359,38 @@ class Base(object):
     def parseOptions(self):
         if self.options['--last'] and self.options['--last'].startswith('v'):
             self.options['--last'] = self.options['--last'][1:]
-        if self.options['-']:
-            self.commitHistory =  Commit.parseCommitHistory(sys.stdin)
+        if 'commitHistory' in self.kwargs: # already parsed by the caller (e.g. served from cache)
+            self.commitHistory = self.kwargs['commitHistory']
+        elif self.options['--plastic']:
+            from .plastic import PlasticHistory
+            commits = PlasticHistory(self.options['--plastic'], int(self.options['--since'] or 0)).iterCommits()
+            self.commitHistory = commits if self.options['--follow'] else list(commits)
+        elif self.options['--follow']:
+            idleTimeout = float(self.options['--idle']) if self.options['--idle'] else None
+            self.commitHistory = Commit.followCommitHistory(self.openCommitHistory(), idleTimeout, self.options['--terminator'])
         else:
-            self.commitHistory = Commit.parseCommitHistory(open(self.options['--commit_hist'], 'r', encoding='utf-8'))
+            stream = self.openCommitHistory()
+            self.commitHistory = Commit.parseCommitHistory(stream)
+            if not self.options['-']:
+                stream.close()
+        if self.options['--dedupe']:
+            # reverts can only be cancelled once the history is complete
+            if self.options['--follow']:
+                self.commitHistory = Commit.iterUniqueCommits(self.commitHistory)
+            else:
+                self.commitHistory = Commit.deduplicateHistory(self.commitHistory)
+        if self.options['--scope']:
+            from .scopes import ScopeIndex
+            scopes = ScopeIndex.parseScopes(self.options['--scope'])
+            if self.options['--follow']:
+                self.commitHistory = (c for c in self.commitHistory if c.scope in scopes)
+            else:
+                # the index may come with a cached history, so that filtered queries don't scan it again
+                scopeIndex = self.kwargs.get('scopeIndex') or ScopeIndex.fromCommits(self.commitHistory)
+                self.commitHistory = scopeIndex.select(self.commitHistory, scopes)
+
+    def openCommitHistory(self):
+        if self.options['-']:
+            # binary stdin, so that compressed histories can be piped in as well; plain input has the stream's encoding
+            return Commit.openCommitHistory(getattr(sys.stdin, 'buffer', sys.stdin), getattr(sys.stdin, 'encoding', None))
+        return Commit.openCommitHistory(self.options['--commit_hist'])
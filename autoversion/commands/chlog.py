@@ -1,89 +1,150 @@
 """chlog command."""
 
 import os
+import io
+import sys
 import mistletoe
 import semver
 import re
+import hashlib
+import tempfile
+from contextlib import contextmanager
 from json import dumps
 from .base import Base
 from .base import Commit
+from .columnar import CommitColumns
+from .template import ChangelogTemplate
 from mistletoe import Document
 from mistletoe.ast_renderer import ASTRenderer
-from datetime import date
+
+class LineWriter:
+    """Writes lines to a stream, joined by newlines (no trailing newline), like ChangelogGenerator.render."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.separator = ''
+
+    def write(self, lines):
+        for line in lines:
+            self.stream.write(self.separator)
+            self.stream.write(line)
+            self.separator = '\n'
 
 class ChangelogGenerator:
     
     OtherChangeTypes = ['perf', 'revert']
     ChangeLogFile = 'CHANGELOG.md'
-    Header = """# Changelog
-
-All notable changes to this project will be documented in this file. See [conventional commits](https://www.conventionalcommits.org/) for commit guidelines.
-
-"""
+    SectionHeadingRegex = re.compile(r'^#{1,2}\s+\[?v?(?P<version>\d+\.\d+\.\d+(?:-[0-9A-Za-z.-]+)?(?:\+[0-9A-Za-z.-]+)?)')
+    Header = ChangelogTemplate.Default['header']
 
-    def __init__(self, changelogMd, changelog, lastVersion):
+    def __init__(self, changelogMd, changelog, lastVersion, template = None):
         self.changelogMdLines = changelogMd.splitlines()
         self.lastVersion = lastVersion
         self.changelog = changelog
+        self.template = template or ChangelogTemplate.default()
+        self.template.checkVersionHeading()
         self.commits = []
 
     def generateChangelog(self, commits):
+        output = io.StringIO()
+        self.writeChangelog(output, commits)
+        return output.getvalue()
+
+    def writeChangelog(self, stream, commits):
+        """Writes the changelog to a stream, one version section at a time (newest first)."""
         if ChangelogGenerator.getChangelogLastVersionIndex(self.changelog) == -1: # add header
-            self.addHeader()
-            self.insertIndex = len(self.changelogMdLines)
+            headLines = self.template.header.splitlines() + self.changelogMdLines
+            tailLines = []
         else:
-            self.insertIndex = self.getChangelogInsertIndex()
+            insertIndex = self.getChangelogInsertIndex()
+            headLines = self.changelogMdLines[:insertIndex]
+            tailLines = self.changelogMdLines[insertIndex:]
 
-        self.versionChanges = []
-        self.currentVersion = Commit.calculateCurrentVersion(self.lastVersion, commits, self.__onCommitProcessed)
-        
-        return ChangelogGenerator.render(self.changelogMdLines)
+        commits = commits if isinstance(commits, list) else list(commits)
+        columns = CommitColumns.fromCommits(commits)
+        boundaries = columns.versionBoundaries()
+        versions = columns.versions(self.lastVersion, boundaries)
+        self.currentVersion = columns.calculateCurrentVersion(self.lastVersion)
 
-    def __onCommitProcessed(self, version, commit):
-        if commit.isVersionCommit():
-            self.changelogMdLines[self.insertIndex:self.insertIndex] = ChangelogGenerator.generateVersionEntry(version, commit, self.versionChanges)
-            self.versionChanges = []
-        else:
-            self.versionChanges.append(commit)
-    
-    def addHeader(self):
-        self.changelogMdLines[0:0] = ChangelogGenerator.Header.splitlines()
+        writer = LineWriter(stream)
+        writer.write(headLines)
+        for idx in reversed(range(len(boundaries))):
+            start = boundaries[idx - 1] + 1 if idx > 0 else 0
+            end = boundaries[idx]
+            writer.write(ChangelogGenerator.generateVersionEntry(versions[idx], commits[end], commits[start:end], self.template))
+        writer.write(tailLines)
 
     def getChangelogInsertIndex(self):
         # iterate over changelog lines and find the first line that starts with lastVersion
         for idx, line in enumerate(self.changelogMdLines):
             if line.startswith('##') and line.find(str(self.lastVersion)) != -1:
                 return idx
-        return len(ChangelogGenerator.Header.splitlines())
+        return len(self.template.header.splitlines())
     
+    @classmethod
+    @contextmanager
+    def replaceFile(cls, path):
+        """Opens a temporary file next to `path` for writing, which replaces `path` once it's complete.
+
+        If writing fails (or is interrupted) the original file is left as it was. A symbolic link is written
+        through: its target is replaced, not the link.
+        """
+        path = os.path.realpath(path)
+        directory, name = os.path.split(path)
+        f = tempfile.NamedTemporaryFile('w', dir=directory, prefix='.' + name + '.', suffix='.tmp', delete=False)
+        try:
+            with f:
+                yield f
+            mode = os.stat(path).st_mode & 0o7777 if os.path.exists(path) else 0o666 & ~cls.umask()
+            os.chmod(f.name, mode)
+            os.replace(f.name, path)
+        except BaseException:
+            os.remove(f.name)
+            raise
+
+    @classmethod
+    def umask(cls):
+        mask = os.umask(0)
+        os.umask(mask)
+        return mask
+
     @classmethod
     def render(cls, entryLines):
         return '\n'.join(entryLines)
 
     @classmethod
-    def generateVersionEntry(cls, version, versionCommit, commits):
-        versionDate = versionCommit.getDateStr() if versionCommit else date.today().strftime("%Y-%m-%d")
-        changelogEntry = '## v{0} ({1})\n\n'.format(version, versionDate)
+    def generateVersionEntry(cls, version, versionCommit, commits, template = None):
+        template = template or ChangelogTemplate.default()
+        changelogEntry = template.renderVersion(version, versionCommit)
         if versionCommit is not None and commits is not None:
             commits.append(versionCommit)
-            changeTypes = {
-                'BREAKING CHANGES': [c for c in commits if c.isBreaking],
-                'Features': [c for c in commits if c.type == 'feat' and not c.isBreaking],
-                'Bug Fixes': [c for c in commits if c.type == 'fix' and not c.isBreaking],
-                'Other': [c for c in commits if c.type in cls.OtherChangeTypes and not c.isBreaking],
-            }
+            # one pass over the commits rather than one per change type
+            changeTypes = {'BREAKING CHANGES': [], 'Features': [], 'Bug Fixes': [], 'Other': []}
+            otherChangeTypes = cls.OtherChangeTypes
+            for c in commits:
+                if c.isBreaking:
+                    changeTypes['BREAKING CHANGES'].append(c)
+                elif c.type == 'feat':
+                    changeTypes['Features'].append(c)
+                elif c.type == 'fix':
+                    changeTypes['Bug Fixes'].append(c)
+                elif c.type in otherChangeTypes:
+                    changeTypes['Other'].append(c)
             for changeType, changes in changeTypes.items():
                 if len(changes) > 0:
-                    changelogEntry = changelogEntry + '### {0}\n\n'.format(changeType)
-                    for change in changes:
-                        changelogEntry += '* {0}\n'.format(change.toChangelogListEntry(changeType == 'Other'))
-                    changelogEntry += '\n'
+                    changelogEntry += template.renderSection(changeType, changes, changeType == 'Other')
             # changelogEntry += '\n'
         return changelogEntry.splitlines()
 
     @classmethod
-    def fromChangelog(cls, changelogFile = ChangeLogFile, version = None):
-        baseVersion = version if version else semver.VersionInfo.parse('0.0.0')
+    def generateReleaseNotes(cls, version, commits, template = None):
+        # the last commit is the one that makes the release
+        if len(commits):
+            return cls.generateVersionEntry(version, commits[-1], commits[0:-1], template)
+        return cls.generateVersionEntry(version, None, None, template)
+
+    @classmethod
+    def fromChangelog(cls, changelogFile = ChangeLogFile, version = None, template = None):
         path = changelogFile if os.path.isabs(changelogFile) else os.path.join(os.getcwd(), changelogFile)
         if os.path.exists(path) and os.path.isfile(path):
             with open(path, 'r') as f:
@@ -92,6 +153,11 @@ All notable changes to this project will be documented in this file. See [conven
         else:
             # print('>>> changelog file not found at: ' + path + ', creating new changelog file')
             changelogMd = ''
+        return cls.fromChangelogMd(changelogMd, version, path, template)
+
+    @classmethod
+    def fromChangelogMd(cls, changelogMd, version = None, path = '', template = None):
+        baseVersion = version if version else semver.VersionInfo.parse('0.0.0')
         try:
             changelog = Document(changelogMd)
             latestVersionFromChlog = ChangelogGenerator.getLatestVersion(changelog)
@@ -103,7 +169,7 @@ All notable changes to this project will be documented in this file. See [conven
         except Exception as e:
             print('>>> error parsing changelog file: ' + path + ': ' + str(e))
             return None
-        return cls(changelogMd, changelog, baseVersion)
+        return cls(changelogMd, changelog, baseVersion, template)
 
     @classmethod
     def getLatestVersion(cls, changelog):
@@ -127,6 +193,20 @@ All notable changes to this project will be documented in this file. See [conven
             return semver.VersionInfo.parse(match.group('version'))
         return None
 
+    @classmethod
+    def scanSections(cls, lines, end=None):
+        """Finds version sections by their headings, without parsing the markdown.
+
+        Returns (version, start, end) line ranges in file order; a section ends where the next one starts.
+        """
+        end = len(lines) if end is None else end
+        starts = []
+        for idx in range(end):
+            match = cls.SectionHeadingRegex.match(lines[idx])
+            if match:
+                starts.append((match.group('version'), idx))
+        return [(version, start, starts[i + 1][1] if i + 1 < len(starts) else end) for i, (version, start) in enumerate(starts)]
+
     @classmethod
     def getChangelogLastVersionIndex(cls, changelog):
         if changelog.children:
@@ -136,12 +216,162 @@ All notable changes to this project will be documented in this file. See [conven
                         return i
         return -1
 
+class ChangelogArchive:
+    """Moves old version sections of a changelog into per-major (or per-year) archive files linked from it."""
+
+    Marker = '<!-- autoversion: archived changelogs -->'
+    LinksTitle = '**Archived changes:**'
+    LinkRegex = re.compile(r'^\* \[(?P<key>[^\]]+)\]\((?P<file>[^)]+)\)$')
+    DateRegex = re.compile(r'\((?P<year>\d{4})-\d{2}-\d{2}\)')
+    ArchiveHeader = """# Changelog ({0})
+
+"""
+
+    def __init__(self, changelogFile, archiveBy = 'major', keep = 1):
+        if archiveBy not in ['major', 'year']:
+            raise ValueError('changelogs can be archived by major version or year, not: ' + str(archiveBy))
+        if keep < 1:
+            raise ValueError('at least one {0} has to be kept in the changelog'.format(archiveBy))
+        self.changelogFile = changelogFile
+        self.archiveBy = archiveBy
+        self.keep = keep
+
+    def sectionKey(self, version, headingLine):
+        if self.archiveBy == 'major':
+            return 'v{0}'.format(semver.VersionInfo.parse(version).major)
+        match = ChangelogArchive.DateRegex.search(headingLine)
+        return match.group('year') if match else None
+
+    def archivePath(self, key):
+        root, ext = os.path.splitext(self.changelogFile)
+        return '{0}-{1}{2}'.format(root, key, ext)
+
+    def archive(self):
+        """Archives the sections beyond the kept majors/years, returns the archive files written."""
+        with open(self.changelogFile, 'r') as f:
+            lines = f.read().splitlines()
+        linksIndex = lines.index(ChangelogArchive.Marker) if ChangelogArchive.Marker in lines else len(lines)
+        sections = ChangelogGenerator.scanSections(lines, linksIndex)
+
+        keptKeys = []
+        moved = {} # archive key -> section lines (newest first)
+        keptLines = lines[:sections[0][1]] if sections else lines[:linksIndex]
+        for version, start, end in sections:
+            key = self.sectionKey(version, lines[start])
+            if key is not None and key not in keptKeys and len(keptKeys) < self.keep:
+                keptKeys.append(key)
+            if key is None or key in keptKeys:
+                keptLines.extend(lines[start:end])
+            else:
+                moved.setdefault(key, []).extend(lines[start:end])
+        if not moved:
+            return []
+
+        # every file is replaced only once it's complete; the archives go first, so an interrupted run
+        # leaves sections in both files at worst, and archiving again skips the ones already archived
+        for key, sectionLines in moved.items():
+            self.prependToArchive(key, sectionLines)
+
+        links = list(moved.keys())
+        for line in lines[linksIndex:]:
+            match = ChangelogArchive.LinkRegex.match(line)
+            if match and match.group('key') not in links:
+                links.append(match.group('key'))
+        while keptLines and not keptLines[-1].strip():
+            keptLines.pop()
+        keptLines.extend(['', ChangelogArchive.Marker, ChangelogArchive.LinksTitle, ''])
+        keptLines.extend(['* [{0}]({1})'.format(key, os.path.basename(self.archivePath(key))) for key in links])
+        with ChangelogGenerator.replaceFile(self.changelogFile) as f:
+            f.write('\n'.join(keptLines) + '\n')
+        return [self.archivePath(key) for key in moved.keys()]
+
+    def prependToArchive(self, key, sectionLines):
+        # moved sections are newer than anything already archived under the same key
+        path = self.archivePath(key)
+        if os.path.isfile(path):
+            with open(path, 'r') as f:
+                archiveLines = f.read().splitlines()
+            sections = ChangelogGenerator.scanSections(archiveLines)
+            insertIndex = sections[0][1] if sections else len(archiveLines)
+            archived = set(version for version, _, _ in sections)
+            sectionLines = [line for version, start, end in ChangelogGenerator.scanSections(sectionLines)
+                if version not in archived for line in sectionLines[start:end]]
+        else:
+            archiveLines = ChangelogArchive.ArchiveHeader.format(key).splitlines()
+            insertIndex = len(archiveLines)
+        archiveLines[insertIndex:insertIndex] = sectionLines
+        with ChangelogGenerator.replaceFile(path) as f:
+            f.write('\n'.join(archiveLines))
+
+class ChangelogCheck:
+    """Verifies that a changelog (and its archives) has up to date sections for the versions of a history.
+
+    Sections are compared by digest; a section whose heading is missing or differs is reported without rendering it.
+    """
+
+    def __init__(self, changelogFile, template = None):
+        self.changelogFile = changelogFile
+        self.template = template or ChangelogTemplate.default()
+        self.template.checkVersionHeading()
+
+    def sectionDigests(self):
+        """Returns version -> (heading line, digest) for the sections of the changelog and its archive files."""
+        digests = {}
+        paths = [self.changelogFile]
+        while paths:
+            path = paths.pop(0)
+            if not os.path.isfile(path):
+                continue
+            with open(path, 'r') as f:
+                lines = f.read().splitlines()
+            linksIndex = lines.index(ChangelogArchive.Marker) if ChangelogArchive.Marker in lines else len(lines)
+            for version, start, end in ChangelogGenerator.scanSections(lines, linksIndex):
+                digests.setdefault(version, (lines[start], ChangelogCheck.digest(lines[start:end])))
+            for line in lines[linksIndex:]:
+                match = ChangelogArchive.LinkRegex.match(line)
+                if match:
+                    paths.append(os.path.join(os.path.dirname(path), match.group('file')))
+        return digests
+
+    def check(self, commits, lastVersion):
+        """Returns (version, 'missing' or 'differs') for the sections that are not up to date, newest first."""
+        commits = commits if isinstance(commits, list) else list(commits)
+        columns = CommitColumns.fromCommits(commits)
+        boundaries = columns.versionBoundaries()
+        versions = columns.versions(lastVersion, boundaries)
+        digests = self.sectionDigests()
+        problems = []
+        for idx in reversed(range(len(boundaries))):
+            version = str(versions[idx])
+            end = boundaries[idx]
+            if version not in digests:
+                problems.append((version, 'missing'))
+                continue
+            heading, digest = digests[version]
+            if heading != self.template.renderVersion(version, commits[end]).split('\n', 1)[0]:
+                problems.append((version, 'differs'))
+                continue
+            start = boundaries[idx - 1] + 1 if idx > 0 else 0
+            entryLines = ChangelogGenerator.generateVersionEntry(versions[idx], commits[end], commits[start:end], self.template)
+            if ChangelogCheck.digest(entryLines) != digest:
+                problems.append((version, 'differs'))
+        return problems
+
+    @classmethod
+    def digest(cls, sectionLines):
+        # blank lines between sections depend on the neighbours, not on the section itself
+        end = len(sectionLines)
+        while end > 0 and not sectionLines[end - 1].strip():
+            end -= 1
+        return hashlib.blake2b('\n'.join(sectionLines[:end]).encode('utf-8'), digest_size=16).digest()
+
 class Chlog(Base):
     ChangeLogFile = 'CHANGELOG.md'
 
     def __init__(self, options, *args, **kwargs):
-        Base.__init__(self, options, args, kwargs)
+        Base.__init__(self, options, *args, **kwargs)
         self.lastVersion = semver.VersionInfo.parse(self.options['--last']) if self.options['--last'] else None
+        self.template = ChangelogTemplate.fromFile(self.options['--template']) if self.options['--template'] else None
 
     def run(self):
         runPath = os.getcwd()
@@ -149,14 +379,21 @@ class Chlog(Base):
             changeLogPath = self.options['--chlog_file'] if os.path.isabs(self.options['--chlog_file']) else os.path.join(runPath, self.options['--chlog_file'])
         else:
             changeLogPath = os.path.join(runPath, Chlog.ChangeLogFile)
-        chlogGenerator = ChangelogGenerator.fromChangelog(changeLogPath, self.lastVersion)
+        if self.options['--check']:
+            problems = ChangelogCheck(changeLogPath, self.template).check(self.commitHistory, self.lastVersion or semver.VersionInfo.parse('0.0.0'))
+            for version, problem in problems:
+                print('{0}: v{1}'.format(problem, version))
+            if problems:
+                sys.exit(1)
+            return
+        chlogGenerator = ChangelogGenerator.fromChangelog(changeLogPath, self.lastVersion, self.template)
         if chlogGenerator is not None:
-            changelog = chlogGenerator.generateChangelog(self.commitHistory)
             if self.options['--noupdate']:
-                print(changelog)
-                pass
+                chlogGenerator.writeChangelog(sys.stdout, self.commitHistory)
+                sys.stdout.write('\n')
             else:
-                with open(changeLogPath, 'w') as f:
-                    f.write(changelog)
+                with ChangelogGenerator.replaceFile(changeLogPath) as f:
+                    chlogGenerator.writeChangelog(f, self.commitHistory)
+                if self.options['--archive']:
+                    ChangelogArchive(changeLogPath, self.options['--archive'], int(self.options['--archive_keep'])).archive()
                 print(chlogGenerator.currentVersion)
-        
\ No newline at end of file
@@ -0,0 +1,98 @@
+"""Columnar (batch) version calculation."""
+
+import re
+import sys
+import semver
+from array import array
+
+class CommitColumns:
+    """Per-commit bump levels in one compact byte array.
+
+    Version boundaries, change counts and the final version are computed with C-level scans over the
+    array (bytes.find/count, or NumPy when available) instead of branching on every commit. NumPy is only
+    imported for histories large enough to pay for the import (or when it is already imported).
+    """
+
+    NoBump = 0
+    PatchBump = 1
+    MinorBump = 2
+    MajorBump = 3
+    LevelByType = {'fix': PatchBump, 'feat': MinorBump}
+    BoundaryRegex = re.compile(b'[\x01-\x03]')
+    NumpyMinCommits = 1000000
+    _numpy = None # the module once imported, False if it is not installed
+
+    def __init__(self, levels):
+        self.levels = levels
+
+    def __len__(self):
+        return len(self.levels)
+
+    def calculateCurrentVersion(self, lastVersion):
+        # same result as Commit.calculateCurrentVersion: a bump resets the lower parts, so only the
+        # bumps after the last higher-level bump count
+        levels = self.levels
+        major, minor, patch = lastVersion.major, lastVersion.minor, lastVersion.patch
+        start = 0
+        lastMajor = levels.rfind(CommitColumns.MajorBump)
+        if lastMajor != -1:
+            major += levels.count(CommitColumns.MajorBump)
+            minor, patch = 0, 0
+            start = lastMajor + 1
+        lastMinor = levels.rfind(CommitColumns.MinorBump, start)
+        if lastMinor != -1:
+            minor += levels.count(CommitColumns.MinorBump, start)
+            patch = 0
+            start = lastMinor + 1
+        patch += levels.count(CommitColumns.PatchBump, start)
+        return semver.VersionInfo(major, minor, patch)
+
+    def commitsSinceBump(self):
+        lastBump = max(self.levels.rfind(level) for level in (CommitColumns.PatchBump, CommitColumns.MinorBump, CommitColumns.MajorBump))
+        return len(self.levels) - 1 - lastBump
+
+    def numpy(self):
+        """NumPy, or None if it is not installed or the history is too small to be worth importing it for."""
+        if CommitColumns._numpy is None and (len(self.levels) >= CommitColumns.NumpyMinCommits or 'numpy' in sys.modules):
+            try:
+                import numpy
+                CommitColumns._numpy = numpy
+            except ImportError:
+                CommitColumns._numpy = False
+        return CommitColumns._numpy or None
+
+    def versionBoundaries(self):
+        """Positions of the commits that bump the version."""
+        np = self.numpy()
+        if np is not None:
+            return array('I', np.flatnonzero(np.frombuffer(self.levels, dtype=np.uint8)).tolist())
+        return array('I', [m.start() for m in CommitColumns.BoundaryRegex.finditer(self.levels)])
+
+    def changeCounts(self, boundaries=None):
+        """Number of commits in each version (since the previous boundary, including the version commit)."""
+        boundaries = boundaries if boundaries is not None else self.versionBoundaries()
+        np = self.numpy()
+        if np is not None:
+            return array('I', np.diff(np.asarray(boundaries, dtype=np.int64), prepend=-1).tolist())
+        return array('I', map(int.__sub__, boundaries, [-1] + boundaries[:-1].tolist()))
+
+    def versions(self, lastVersion, boundaries=None):
+        """Versions released at each boundary; walks the boundaries only, not every commit."""
+        boundaries = boundaries if boundaries is not None else self.versionBoundaries()
+        versions = []
+        major, minor, patch = lastVersion.major, lastVersion.minor, lastVersion.patch
+        for position in boundaries:
+            level = self.levels[position]
+            if level == CommitColumns.MajorBump:
+                major, minor, patch = major + 1, 0, 0
+            elif level == CommitColumns.MinorBump:
+                minor, patch = minor + 1, 0
+            else:
+                patch += 1
+            versions.append(semver.VersionInfo(major, minor, patch))
+        return versions
+
+    @classmethod
+    def fromCommits(cls, commits):
+        levelByType = cls.LevelByType
+        return cls(bytearray(cls.MajorBump if c.isBreaking else levelByType.get(c.type, cls.NoBump) for c in commits))
@@ -2,14 +2,27 @@
 
 from .base import Base
 from .base import Commit
+from .columnar import CommitColumns
 from json import dumps
 import semver
 
 class Current(Base):
     def __init__(self, options, *args, **kwargs):
-        Base.__init__(self, options, args, kwargs)
+        Base.__init__(self, options, *args, **kwargs)
         self.lastVersion = semver.VersionInfo.parse(self.options['--last']) if self.options['--last'] else semver.VersionInfo.parse('0.0.0')
 
     def run(self):
-        currentVersion = Commit.calculateCurrentVersion(self.lastVersion, self.commitHistory)
-        print(str(currentVersion))
+        if self.options['--follow']:
+            # the history is unbounded: print the version as each commit arrives
+            def onCommitProcessed(version, commit):
+                print('{0} {1}'.format(commit.hash, version.finalize_version()), flush=True)
+            Commit.calculateCurrentVersion(self.lastVersion, self.commitHistory, onCommitProcessed)
+            return
+        columns = CommitColumns.fromCommits(self.commitHistory)
+        currentVersion = columns.calculateCurrentVersion(self.lastVersion)
+        if self.options['--channels']:
+            lastCommit = self.commitHistory[-1] if len(self.commitHistory) else None
+            channels = Commit.versionChannels(currentVersion, columns.commitsSinceBump(), lastCommit)
+            print(dumps({name: str(version) for (name, version) in channels.items()}, indent=4))
+        else:
+            print(str(currentVersion))
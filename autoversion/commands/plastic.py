@@ -0,0 +1,71 @@
+"""PlasticSCM history source."""
+
+import os
+import re
+import shlex
+import datetime
+import subprocess
+from .base import Commit
+
+class PlasticHistory:
+    """Reads the changesets of a PlasticSCM branch with `cm find`, one page at a time.
+
+    Changesets are queried by id range (`changesetid > N`) with an unambiguous date format and unit/record
+    separators, so multi-line comments and locale settings don't matter. The next page is requested before
+    the current one is parsed. The `cm` command can be changed with the AUTOVERSION_CM environment variable.
+    """
+
+    PageSize = 1000
+    UnitSeparator = '\x1f'
+    RecordSeparator = '\x1e'
+    Format = '{changesetid}\x1f{date}\x1f{comment}\x1e'
+    DateFormat = 'yyyy-MM-ddTHH:mm:ss'
+    DateParseFormat = '%Y-%m-%dT%H:%M:%S'
+    BranchRegex = re.compile(r"^[^'\"]+$")
+
+    def __init__(self, branch, since = 0, pageSize = None):
+        if not PlasticHistory.BranchRegex.match(branch):
+            raise ValueError('invalid branch name: ' + repr(branch))
+        self.branch = branch
+        self.since = since
+        self.pageSize = pageSize or PlasticHistory.PageSize
+        self.command = shlex.split(os.environ.get('AUTOVERSION_CM', 'cm'))
+
+    def query(self, since):
+        return "where branch='{0}' and changesetid > {1} order by changesetid asc limit {2}".format(self.branch, since, self.pageSize)
+
+    def requestPage(self, since):
+        args = self.command + ['find', 'changeset', self.query(since), '--format=' + PlasticHistory.Format,
+            '--dateformat=' + PlasticHistory.DateFormat, '--nototal']
+        return subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, encoding='utf-8', errors='replace')
+
+    def readPage(self, process):
+        """Waits for a requested page, returns its (changeset id, date, comment) records."""
+        output, errors = process.communicate()
+        if process.returncode != 0:
+            raise RuntimeError('cm find failed ({0}): {1}'.format(process.returncode, errors.strip()))
+        records = []
+        for record in output.split(PlasticHistory.RecordSeparator):
+            fields = record.lstrip('\r\n').split(PlasticHistory.UnitSeparator, 2)
+            if len(fields) == 3:
+                records.append(fields)
+        return records
+
+    def iterCommits(self):
+        """Yields the commits of the branch after the `since` changeset, oldest first."""
+        process = self.requestPage(self.since)
+        while process is not None:
+            records = self.readPage(process)
+            # a full page may be followed by more changesets: ask for them while this page is parsed
+            process = self.requestPage(int(records[-1][0])) if len(records) >= self.pageSize else None
+            for changesetId, changesetDate, comment in records:
+                commit = Commit.parseHistoryRecord(changesetId, PlasticHistory.parseDate(changesetDate), comment)
+                if commit is not None:
+                    yield commit
+
+    @classmethod
+    def parseDate(cls, text):
+        try:
+            return datetime.datetime.strptime(text.strip(), cls.DateParseFormat)
+        except ValueError:
+            return None
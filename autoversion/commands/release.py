@@ -3,16 +3,15 @@
 import semver
 from .base import Base
 from .chlog import ChangelogGenerator
+from .template import ChangelogTemplate
 
 class Release(Base):
 
     def __init__(self, options, *args, **kwargs):
-        Base.__init__(self, options, args, kwargs)
+        Base.__init__(self, options, *args, **kwargs)
         self.lastVersion = semver.VersionInfo.parse(self.options['--current']) if self.options['--current'] else None
+        self.template = ChangelogTemplate.fromFile(self.options['--template']) if self.options['--template'] else None
 
     def run(self):
-        if len(self.commitHistory):
-            lines = ChangelogGenerator.generateVersionEntry(self.lastVersion, self.commitHistory[-1], self.commitHistory[0:-1])
-        else:
-            lines = ChangelogGenerator.generateVersionEntry(self.lastVersion, None, None)
+        lines = ChangelogGenerator.generateReleaseNotes(self.lastVersion, self.commitHistory, self.template)
         print('\n'.join(lines))
\ No newline at end of file
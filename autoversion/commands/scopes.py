@@ -0,0 +1,47 @@
+"""scopes command."""
+
+import heapq
+from array import array
+from .base import Base
+
+class ScopeIndex:
+    """Positions of the commits of each scope in a parsed history (unscoped commits under None)."""
+
+    def __init__(self):
+        self.positions = {}
+        self.size = 0
+
+    def append(self, commit):
+        positions = self.positions.get(commit.scope)
+        if positions is None:
+            positions = self.positions[commit.scope] = array('I')
+        positions.append(self.size)
+        self.size += 1
+
+    def counts(self):
+        """Number of commits of each scope, most used scopes first."""
+        counts = [(scope, len(positions)) for scope, positions in self.positions.items() if scope is not None]
+        return sorted(counts, key=lambda count: (-count[1], count[0]))
+
+    def select(self, commits, scopes):
+        """Commits of the given scopes, in history order."""
+        lists = [self.positions[scope] for scope in scopes if scope in self.positions]
+        positions = lists[0] if len(lists) == 1 else heapq.merge(*lists)
+        return [commits[position] for position in positions]
+
+    @classmethod
+    def fromCommits(cls, commits):
+        index = cls()
+        for commit in commits:
+            index.append(commit)
+        return index
+
+    @classmethod
+    def parseScopes(cls, scopes):
+        return list(dict.fromkeys(scope.strip() for scope in scopes.split(',') if scope.strip()))
+
+class Scopes(Base):
+
+    def run(self):
+        for scope, count in ScopeIndex.fromCommits(self.commitHistory).counts():
+            print('{0} {1}'.format(scope, count))
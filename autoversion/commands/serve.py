@@ -0,0 +1,167 @@
+"""serve command."""
+
+import os
+import sys
+import stat
+import json
+import codecs
+import base64
+import signal
+import socketserver
+from collections import OrderedDict
+from .base import Base
+from .base import Commit
+
+class HistoryCache:
+    """Parsed commit histories keyed by file path, invalidated when the last commit hash, the size or the
+    modification time of the file changes."""
+
+    MaxEntries = 32
+    TailBlockSize = 4096
+
+    def __init__(self):
+        self.entries = OrderedDict()
+
+    def get(self, path):
+        return self.getEntry(path)[1]
+
+    def getScopeIndex(self, path):
+        entry = self.getEntry(path)
+        if entry[2] is None:
+            from .scopes import ScopeIndex
+            entry[2] = ScopeIndex.fromCommits(entry[1])
+        return entry[2]
+
+    def getEntry(self, path):
+        # [(last hash, size, modification time), commits, scope index (built on first use)]
+        # a file regenerated for another range of commits can end with the same hash
+        fileStat = os.stat(path)
+        key = (HistoryCache.readLastHash(path), fileStat.st_size, fileStat.st_mtime_ns)
+        entry = self.entries.get(path)
+        if entry is None or entry[0] != key:
+            with Commit.openCommitHistory(path) as f:
+                entry = [key, Commit.parseCommitHistory(f), None]
+            self.entries[path] = entry
+            if len(self.entries) > HistoryCache.MaxEntries:
+                self.entries.popitem(last=False)
+        self.entries.move_to_end(path)
+        return entry
+
+    @classmethod
+    def readLastHash(cls, path):
+        # scan the file backwards for the last history header line, without reading the whole file
+        with open(path, 'rb') as f:
+            if Commit.detectCompression(f.read(6)) is not None:
+                # compressed histories can't be read backwards, use the file modification instead
+                stat = os.fstat(f.fileno())
+                return 'mtime:{0}:{1}'.format(stat.st_mtime_ns, stat.st_size)
+            end = f.seek(0, os.SEEK_END)
+            blockSize = cls.TailBlockSize
+            while True:
+                start = max(0, end - blockSize)
+                f.seek(start)
+                lines = f.read(end - start).decode('utf-8', errors='replace').splitlines()
+                if start > 0:
+                    lines = lines[1:] # first line may be cut in the middle
+                for line in reversed(lines):
+                    match = Commit.HistoryLineRegex.match(line)
+                    if match:
+                        return match.group('hash')
+                if start == 0:
+                    return None
+                blockSize *= 2
+
+class CommandServer:
+    """Runs command lines in this process, answering line-delimited JSON-RPC 2.0 requests."""
+
+    def __init__(self):
+        self.historyCache = HistoryCache()
+
+    def handle(self, requestLine):
+        try:
+            message = json.loads(requestLine)
+        except ValueError as e:
+            return CommandServer.error(None, -32700, 'Parse error: {0}'.format(e))
+        if not isinstance(message, dict) or message.get('method') != 'run':
+            requestId = message.get('id') if isinstance(message, dict) else None
+            return CommandServer.error(requestId, -32601, 'Method not found')
+        params = message.get('params') or {}
+        try:
+            CommandServer.checkParams(params)
+            stdin = base64.b64decode(params['stdin_b64'], validate=True) if 'stdin_b64' in params else params.get('stdin', '')
+        except (TypeError, ValueError, LookupError) as e:
+            return CommandServer.error(message.get('id'), -32602, 'Invalid params: {0}'.format(e))
+        return {'jsonrpc': '2.0', 'id': message.get('id'), 'result': self.run(params, stdin)}
+
+    def run(self, params, stdin):
+        # commands swap the process-wide stdin, stdout and working directory, so requests are served one at a time
+        from .. import api
+        return api.run(params.get('argv', []), stdin, params.get('cwd'), history_cache=self.historyCache, stdin_encoding=params.get('stdin_encoding'))
+
+    @classmethod
+    def checkParams(cls, params):
+        if not isinstance(params, dict):
+            raise TypeError('params must be an object')
+        argv = params.get('argv', [])
+        if not isinstance(argv, list) or not all(isinstance(arg, str) for arg in argv):
+            raise TypeError('argv must be a list of strings')
+        for name in ['stdin', 'stdin_b64', 'cwd', 'stdin_encoding']:
+            if params.get(name) is not None and not isinstance(params[name], str):
+                raise TypeError('{0} must be a string'.format(name))
+        if params.get('stdin_encoding') is not None:
+            codecs.lookup(params['stdin_encoding'])
+
+    def serveStream(self, inStream, outStream):
+        for line in iter(inStream.readline, ''):
+            if line.strip():
+                outStream.write(json.dumps(self.handle(line)) + '\n')
+                outStream.flush()
+
+    def serveSocket(self, socketPath):
+        if not hasattr(socketserver, 'UnixStreamServer'):
+            raise RuntimeError('Unix sockets are not supported on this platform')
+        if os.path.lexists(socketPath):
+            if not stat.S_ISSOCK(os.lstat(socketPath).st_mode):
+                raise RuntimeError('not a socket, refusing to replace: ' + socketPath)
+            os.remove(socketPath) # stale socket of a previous server
+        commandServer = self
+
+        class RequestHandler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    if line.strip():
+                        response = commandServer.handle(line.decode('utf-8'))
+                        self.wfile.write((json.dumps(response) + '\n').encode('utf-8'))
+                        self.wfile.flush()
+
+        with socketserver.UnixStreamServer(socketPath, RequestHandler) as server:
+            # stop on SIGTERM as on Ctrl+C, so that the socket file is removed
+            previousHandler = signal.signal(signal.SIGTERM, CommandServer.interrupt)
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                signal.signal(signal.SIGTERM, previousHandler)
+                os.remove(socketPath)
+
+    @classmethod
+    def interrupt(cls, signalNumber, frame):
+        raise KeyboardInterrupt()
+
+    @classmethod
+    def error(cls, requestId, code, message):
+        return {'jsonrpc': '2.0', 'id': requestId, 'error': {'code': code, 'message': message}}
+
+class Serve(Base):
+
+    def parseOptions(self):
+        # histories are read per request
+        self.commitHistory = []
+
+    def run(self):
+        server = CommandServer()
+        if self.options['--socket']:
+            server.serveSocket(self.options['--socket'])
+        else:
+            server.serveStream(sys.stdin, sys.stdout)
@@ -0,0 +1,233 @@
+"""Changelog templates."""
+
+import re
+import json
+import operator
+from datetime import date
+
+class TemplatePart:
+    """One part of a changelog template, compiled into a render function.
+
+    `{name}` is replaced with a value, `{?name}...{/name}` is kept only if the value is not empty and
+    `{{`, `}}` are literal braces. The template is parsed once into a plan of literal, field and
+    conditional steps, which is compiled into `renderValues`, a function of the field values (a tuple of
+    strings); `render` takes the fields as arguments.
+    """
+
+    TokenRegex = re.compile(r'\{\{|\}\}|\{\?(?P<open>\w+)\}|\{/(?P<close>\w+)\}|\{(?P<name>\w+)\}|[{}]')
+
+    def __init__(self, text, fields):
+        self.text = text
+        self.fields = list(fields)
+        self.names = set()
+        self.plan = self.parse(text)
+        self.renderValues = self.compile(self.plan)
+
+    def parse(self, text):
+        """Returns the plan: a list of ('literal', text), ('field', name) and ('if', name, plan) steps."""
+        plan = []
+        stack = []
+        position = 0
+        for match in TemplatePart.TokenRegex.finditer(text):
+            token = match.group(0)
+            TemplatePart.addLiteral(plan, text[position:match.start()])
+            position = match.end()
+            if token in ('{{', '}}'):
+                TemplatePart.addLiteral(plan, token[0])
+                continue
+            if token in ('{', '}'):
+                raise ValueError('unescaped brace at {0} in template: {1!r}'.format(match.start(), text))
+            name = match.group('open') or match.group('close') or match.group('name')
+            if name not in self.fields:
+                raise ValueError('unknown field {0!r} in template: {1!r} (fields: {2})'.format(name, text, ', '.join(self.fields)))
+            self.names.add(name)
+            if match.group('open'):
+                step = ('if', name, [])
+                plan.append(step)
+                stack.append((name, plan))
+                plan = step[2]
+            elif match.group('close'):
+                if not stack or stack[-1][0] != name:
+                    raise ValueError('unexpected {{/{0}}} in template: {1!r}'.format(name, text))
+                plan = stack.pop()[1]
+            else:
+                plan.append(('field', name))
+        if stack:
+            raise ValueError('missing {{/{0}}} in template: {1!r}'.format(stack[-1][0], text))
+        TemplatePart.addLiteral(plan, text[position:])
+        return plan
+
+    @classmethod
+    def addLiteral(cls, plan, literal):
+        if not literal:
+            return
+        if plan and plan[-1][0] == 'literal':
+            plan[-1] = ('literal', plan[-1][1] + literal)
+        else:
+            plan.append(('literal', literal))
+
+    def compile(self, plan):
+        """Returns a function of the field values (a tuple) rendering the plan.
+
+        Conditionals only depend on which of their fields are empty, so each combination of them (a bitmask)
+        gets the positions of its output pieces in the field values followed by the literals, and the pieces
+        are picked with an itemgetter and joined.
+        """
+        fields = self.fields
+        conditions = tuple((fields.index(name), 1 << bit) for bit, name in enumerate(dict.fromkeys(TemplatePart.conditionNames(plan))))
+        literals = {'': len(fields)}
+        getters = []
+        for mask in range(1 << len(conditions)):
+            presentNames = {fields[index] for index, bit in conditions if mask & bit}
+            positions = []
+            for kind, value in TemplatePart.pieces(plan, presentNames):
+                positions.append(fields.index(value) if kind == 'field' else literals.setdefault(value, len(fields) + len(literals)))
+            # an itemgetter of one position returns the value itself rather than a tuple
+            positions += [len(fields)] * (2 - len(positions))
+            getters.append(operator.itemgetter(*positions))
+        literals = tuple(literals)
+        if not conditions:
+            getter = getters[0]
+            return lambda values: ''.join(getter(values + literals))
+        def renderValues(values):
+            mask = 0
+            for index, bit in conditions:
+                if values[index]:
+                    mask |= bit
+            return ''.join(getters[mask](values + literals))
+        return renderValues
+
+    def render(self, *args, **kwargs):
+        """Renders the fields, given by position or by name."""
+        if kwargs or len(args) != len(self.fields):
+            args = TemplatePart.bindFields(self.fields, args, kwargs)
+        return self.renderValues(args)
+
+    @classmethod
+    def conditionNames(cls, plan):
+        for step in plan:
+            if step[0] == 'if':
+                yield step[1]
+                yield from cls.conditionNames(step[2])
+
+    @classmethod
+    def pieces(cls, plan, presentNames):
+        """The plan without conditionals: the steps of the conditionals of `presentNames` are kept, the others dropped."""
+        pieces = []
+        for step in plan:
+            if step[0] != 'if':
+                kept = [step]
+            elif step[1] in presentNames:
+                kept = cls.pieces(step[2], presentNames)
+            else:
+                continue
+            for piece in kept:
+                if piece[0] == 'literal':
+                    cls.addLiteral(pieces, piece[1])
+                else:
+                    pieces.append(piece)
+        return pieces
+
+    @classmethod
+    def bindFields(cls, fields, args, kwargs):
+        if not args and len(kwargs) == len(fields) and all(name in kwargs for name in fields):
+            return tuple([kwargs[name] for name in fields])
+        if len(args) > len(fields):
+            raise TypeError('render() takes {0} fields but {1} were given'.format(len(fields), len(args)))
+        unknown = [name for name in kwargs if name not in fields[len(args):]]
+        missing = [name for name in fields[len(args):] if name not in kwargs]
+        if unknown or missing:
+            raise TypeError('render() got unexpected fields {0} or is missing fields {1}'.format(unknown, missing))
+        return tuple(args) + tuple(kwargs[name] for name in fields[len(args):])
+
+class ChangelogTemplate:
+    """Markdown layout of a changelog: the header, version headings, change type sections and entries.
+
+    The built-in template renders the same changelog as earlier versions, byte for byte.
+    """
+
+    Parts = ['header', 'version', 'section', 'entry']
+    Default = {
+        'header': """# Changelog
+
+All notable changes to this project will be documented in this file. See [conventional commits](https://www.conventionalcommits.org/) for commit guidelines.
+
+""",
+        'version': '## v{version} ({date})\n\n',
+        'section': '### {title}\n\n{entries}\n',
+        'entry': '* {?scope}**{scope}:** {/scope}{summary}{?body}\n\n{body}\n{/body}{?note}\n\n{note}{/note}\n',
+    }
+    VersionFields = ['version', 'date', 'hash']
+    SectionFields = ['title', 'entries']
+    EntryFields = ['hash', 'date', 'type', 'scope', 'summary', 'body', 'note']
+    # changelogs are read back by their version headings (see ChangelogGenerator.SectionHeadingRegex):
+    # a level 2 heading starting with the version, optionally after `[` and `v`. Release notes can use any heading.
+    SampleVersion = '1.22.333-rc.1+build.5'
+    VersionHeadingRegex = re.compile(r'^##[ \t]+\[?v?' + re.escape(SampleVersion) + r'(?![0-9A-Za-z.+-])')
+
+    _default = None
+
+    def __init__(self, parts = None):
+        parts = dict(ChangelogTemplate.Default, **(parts or {}))
+        unknownParts = [name for name in parts if name not in ChangelogTemplate.Parts]
+        if unknownParts:
+            raise ValueError('unknown template parts: {0} (parts: {1})'.format(', '.join(unknownParts), ', '.join(ChangelogTemplate.Parts)))
+        self.header = TemplatePart(parts['header'], []).renderValues(())
+        self.version = TemplatePart(parts['version'], ChangelogTemplate.VersionFields)
+        self.section = TemplatePart(parts['section'], ChangelogTemplate.SectionFields)
+        self.entry = TemplatePart(parts['entry'], ChangelogTemplate.EntryFields)
+        self.entryDates = 'date' in self.entry.names # formatting dates is not free
+
+    def checkVersionHeading(self):
+        """Raises ValueError if changelogs written with the template could not be read back."""
+        if not ChangelogTemplate.VersionHeadingRegex.match(self.version.renderValues((ChangelogTemplate.SampleVersion, '2000-01-31', 'abcdef0'))):
+            raise ValueError('changelog version template must start with a level 2 heading starting with the version, like "## v{version}": '
+                + repr(self.version.text))
+
+    def renderVersion(self, version, versionCommit):
+        return self.version.renderValues((
+            str(version),
+            versionCommit.getDateStr() if versionCommit else date.today().strftime("%Y-%m-%d"),
+            (versionCommit.hash if versionCommit else None) or ''))
+
+    def renderSection(self, title, commits, skipBody = False):
+        renderEntry = self.entry.renderValues
+        entryDates = self.entryDates
+        # the entry values are built inline (as in entryValues), sections can have many entries
+        entries = ''.join([renderEntry((
+            c.hash or '',
+            c.getDateStr() if entryDates else '',
+            c.type or '',
+            c.scope or '',
+            c.summary,
+            '' if skipBody else c.body,
+            c.footerValue if c.isBreaking and c.footerValue else '')) for c in commits])
+        return self.section.renderValues((title, entries))
+
+    def renderEntry(self, commit, skipBody = False):
+        return self.entry.renderValues(self.entryValues(commit, skipBody))
+
+    def entryValues(self, commit, skipBody):
+        return (
+            commit.hash or '',
+            commit.getDateStr() if self.entryDates else '',
+            commit.type or '',
+            commit.scope or '',
+            commit.summary,
+            '' if skipBody else commit.body,
+            commit.footerValue if commit.isBreaking and commit.footerValue else '')
+
+    @classmethod
+    def default(cls):
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    @classmethod
+    def fromFile(cls, path):
+        """Loads a template from a JSON file with (some of) the header, version, section and entry parts."""
+        with open(path, 'r') as f:
+            parts = json.load(f)
+        if not isinstance(parts, dict):
+            raise ValueError('template file must contain a JSON object: ' + path)
+        return cls(parts)
@@ -0,0 +1,124 @@
+"""timeline command."""
+
+import sys
+import json
+import bisect
+import datetime
+import semver
+from array import array
+from .base import Base
+from .base import Commit
+
+class VersionTimeline:
+    """Commit hash/date to version index, built in one pass over the commit history."""
+
+    DateFormats = ['%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d', '%m/%d/%Y %I:%M:%S %p', '%m/%d/%Y']
+
+    # distinct versions are stored once, commits keep an index into that table
+    def __init__(self, versions=None, versionIndex=None, hashes=None, timestamps=None):
+        self.versions = versions if versions is not None else []
+        self.versionIndex = versionIndex if versionIndex is not None else array('I')
+        self.hashes = hashes if hashes is not None else []
+        self.timestamps = timestamps if timestamps is not None else array('d')
+        self.positions = {commitHash: idx for idx, commitHash in enumerate(self.hashes)}
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def append(self, version, commit):
+        versionStr = str(version.finalize_version())
+        if not self.versions or self.versions[-1] != versionStr:
+            self.versions.append(versionStr)
+        self.versionIndex.append(len(self.versions) - 1)
+        self.positions[commit.hash] = len(self.hashes)
+        self.hashes.append(commit.hash)
+        self.timestamps.append(VersionTimeline.toTimestamp(commit.date) if commit.date else 0.0)
+
+    def versionAt(self, position):
+        return semver.VersionInfo.parse(self.versions[self.versionIndex[position]])
+
+    def versionForHash(self, commitHash):
+        position = self.positions.get(commitHash)
+        return self.versionAt(position) if position is not None else None
+
+    def versionForDate(self, date):
+        # the version of the last commit made at or before the given date
+        position = bisect.bisect_right(self.timestamps, VersionTimeline.toTimestamp(date)) - 1
+        return self.versionAt(position) if position >= 0 else None
+
+    def query(self, query):
+        query = query.strip()
+        if query in self.positions:
+            return self.versionForHash(query)
+        date = VersionTimeline.parseDate(query)
+        return self.versionForDate(date) if date else None
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'versions': self.versions,
+                'index': self.versionIndex.tolist(),
+                'hashes': self.hashes,
+                'timestamps': self.timestamps.tolist()
+            }, f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data['versions'], array('I', data['index']), data['hashes'], array('d', data['timestamps']))
+
+    @classmethod
+    def fromHistory(cls, lastVersion, commitHistory):
+        timeline = cls()
+        timeline.currentVersion = Commit.calculateCurrentVersion(lastVersion, commitHistory, timeline.append)
+        return timeline
+
+    @classmethod
+    def toTimestamp(cls, date):
+        # commit dates are naive, keep the index independent of the local timezone
+        return (date - datetime.datetime(1970, 1, 1)).total_seconds()
+
+    @classmethod
+    def parseDate(cls, dateStr):
+        for dateFormat in cls.DateFormats:
+            try:
+                return datetime.datetime.strptime(dateStr, dateFormat)
+            except ValueError:
+                pass
+        return None
+
+class Timeline(Base):
+
+    def __init__(self, options, *args, **kwargs):
+        Base.__init__(self, options, *args, **kwargs)
+        self.lastVersion = semver.VersionInfo.parse(self.options['--last']) if self.options['--last'] else semver.VersionInfo.parse('0.0.0')
+
+    def parseOptions(self):
+        # a saved index is queried without reading any commit history
+        if self.options['--index']:
+            self.commitHistory = []
+        else:
+            Base.parseOptions(self)
+
+    def run(self):
+        if self.options['--index']:
+            timeline = VersionTimeline.load(self.options['--index'])
+            if self.options['--query']:
+                self.printQuery(timeline, self.options['--query'])
+            if self.options['-']:
+                for line in iter(sys.stdin.readline, ''):
+                    if line.strip():
+                        self.printQuery(timeline, line)
+        else:
+            timeline = VersionTimeline.fromHistory(self.lastVersion, self.commitHistory)
+            if self.options['--save']:
+                timeline.save(self.options['--save'])
+                print(timeline.currentVersion)
+            else:
+                for position, commitHash in enumerate(timeline.hashes):
+                    print('{0} {1}'.format(commitHash, timeline.versionAt(position)))
+
+    def printQuery(self, timeline, query):
+        version = timeline.query(query)
+        print('{0} {1}'.format(query.strip(), version if version else '-'))
@@ -0,0 +1,124 @@
+"""Benchmark: changelog rendering with compiled templates vs the former hard-coded format strings.
+
+Renders every version of a large synthetic history with the previous `str.format` based
+implementation, the built-in template and a custom template. The built-in template output is
+checked to be identical to the previous output, and the benchmark fails (exit status 1) when the
+built-in template is slower than the previous implementation by more than the tolerance.
+
+    python benchmarks/bench_changelog_templates.py [--commits=200000] [--repeat=3] [--tolerance=0.1]
+"""
+
+import os
+import io
+import gc
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import semver
+from autoversion.commands.base import Commit
+from autoversion.commands.chlog import ChangelogGenerator, LineWriter
+from autoversion.commands.columnar import CommitColumns
+from autoversion.commands.template import ChangelogTemplate
+
+Messages = ['feat(api): add endpoint number {0}', 'fix: handle edge case {0}\n\nLonger description of the fix\nspanning two lines.',
+    'docs: update readme {0}', 'chore(deps): bump dependency {0}', 'perf: speed up parsing {0}',
+    'feat(core)!: drop legacy option {0}\n\nBREAKING CHANGE: the option is gone']
+CustomTemplate = {
+    'version': '## [{version}] - {date}\n\n',
+    'section': '#### {title}\n\n{entries}\n',
+    'entry': '- {?scope}_{scope}_: {/scope}{summary} ({hash}){?note} **{note}**{/note}\n',
+}
+
+def generateHistory(commits):
+    lines = []
+    for idx in range(commits):
+        lines.append('{0:07x} 9/{1}/2022 {2}:{3:02d}:00 PM {4}\n'.format(idx, 1 + idx % 28, 1 + idx % 12, idx % 60, Messages[idx % len(Messages)].format(idx)))
+    return Commit.parseCommitHistory(io.StringIO(''.join(lines)))
+
+def formatStringListEntry(commit, skipBody):
+    entry = '{0}'.format(commit.summary) if skipBody or len(commit.body) == 0 else '{0}\n\n{1}\n'.format(commit.summary, commit.body)
+    if commit.scope:
+        entry = '**{0}:** {1}'.format(commit.scope, entry)
+    if commit.isBreaking and commit.footerValue:
+        entry = '{0}\n\n{1}'.format(entry, commit.footerValue)
+    return entry
+
+def formatStringEntry(version, versionCommit, commits):
+    # the rendering before templates, kept as the baseline
+    versionDate = versionCommit.getDateStr() if versionCommit else date.today().strftime("%Y-%m-%d")
+    changelogEntry = '## v{0} ({1})\n\n'.format(version, versionDate)
+    if versionCommit is not None and commits is not None:
+        commits.append(versionCommit)
+        changeTypes = {
+            'BREAKING CHANGES': [c for c in commits if c.isBreaking],
+            'Features': [c for c in commits if c.type == 'feat' and not c.isBreaking],
+            'Bug Fixes': [c for c in commits if c.type == 'fix' and not c.isBreaking],
+            'Other': [c for c in commits if c.type in ChangelogGenerator.OtherChangeTypes and not c.isBreaking],
+        }
+        for changeType, changes in changeTypes.items():
+            if len(changes) > 0:
+                changelogEntry = changelogEntry + '### {0}\n\n'.format(changeType)
+                for change in changes:
+                    changelogEntry += '* {0}\n'.format(formatStringListEntry(change, changeType == 'Other'))
+                changelogEntry += '\n'
+    return changelogEntry.splitlines()
+
+def render(commits, renderEntry):
+    columns = CommitColumns.fromCommits(commits)
+    boundaries = columns.versionBoundaries()
+    versions = columns.versions(semver.VersionInfo.parse('0.0.0'), boundaries)
+    output = io.StringIO()
+    writer = LineWriter(output)
+    for idx in reversed(range(len(boundaries))):
+        start = boundaries[idx - 1] + 1 if idx > 0 else 0
+        end = boundaries[idx]
+        writer.write(renderEntry(versions[idx], commits[end], commits[start:end]))
+    return output.getvalue()
+
+def templateEntry(template):
+    return lambda version, versionCommit, commits: ChangelogGenerator.generateVersionEntry(version, versionCommit, commits, template)
+
+def measure(commits, renderEntries, repeat):
+    # the renderers take turns, so that load changes on the machine affect all of them alike, and run
+    # without garbage collections (as timeit does), which would land on whichever renderer is running
+    outputs = [None] * len(renderEntries)
+    best = [None] * len(renderEntries)
+    for _ in range(repeat):
+        for idx, renderEntry in enumerate(renderEntries):
+            outputs[idx] = None
+            gc.collect()
+            gc.disable()
+            try:
+                start = time.perf_counter()
+                outputs[idx] = render(commits, renderEntry)
+                elapsed = time.perf_counter() - start
+            finally:
+                gc.enable()
+            best[idx] = elapsed if best[idx] is None else min(best[idx], elapsed)
+    return outputs, best
+
+def main():
+    commits, repeat, tolerance = 200000, 3, 0.1
+    for arg in sys.argv[1:]:
+        if arg.startswith('--commits='):
+            commits = int(arg.split('=', 1)[1])
+        elif arg.startswith('--repeat='):
+            repeat = int(arg.split('=', 1)[1])
+        elif arg.startswith('--tolerance='):
+            tolerance = float(arg.split('=', 1)[1])
+    history = generateHistory(commits)
+    print('{0} commits, best of {1}'.format(commits, repeat))
+    (expected, output, _), (baseline, elapsed, custom) = measure(history,
+        [formatStringEntry, templateEntry(ChangelogTemplate()), templateEntry(ChangelogTemplate(CustomTemplate))], repeat)
+    assert output == expected, 'built-in template output differs'
+    print('{0:<16} {1:>8.2f} s'.format('format strings', baseline))
+    print('{0:<16} {1:>8.2f} s {2:>+7.1%}'.format('built-in', elapsed, elapsed / baseline - 1))
+    print('{0:<16} {1:>8.2f} s {2:>+7.1%}'.format('custom', custom, custom / baseline - 1))
+    if elapsed / baseline - 1 > tolerance:
+        print('built-in template is slower than format strings by more than {0:.0%}'.format(tolerance))
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""Benchmark: compressed commit history input, `zcat`-style pipe vs native decompression.
+
+Generates a large synthetic history, compresses it with gzip, xz and bz2 and reads it through an
+external decompressor pipe and through Commit.openCommitHistory. Reports the time to read all
+lines, the time to parse all commits (without keeping them) and the peak Python memory while
+reading, which stays flat for native decompression regardless of the history size.
+
+    python benchmarks/bench_compressed_history.py [--commits=50000]
+"""
+
+import os
+import io
+import sys
+import gzip
+import lzma
+import bz2
+import time
+import shutil
+import tempfile
+import tracemalloc
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from autoversion.commands.base import Commit
+
+Formats = [('gzip', gzip.open, ['zcat']), ('xz', lzma.open, ['xzcat']), ('bz2', bz2.open, ['bzcat'])]
+Messages = ['feat(api): add endpoint number {0}', 'fix: handle edge case {0}\n\nLonger description of the fix\nspanning two lines.',
+    'docs: update readme {0}', 'chore(deps): bump dependency {0}', 'perf: speed up parsing {0}']
+
+def generateHistory(path, commits):
+    with open(path, 'w', encoding='utf-8') as f:
+        for idx in range(commits):
+            f.write('{0:07x} 9/{1}/2022 {2}:{3:02d}:00 PM {4}\n'.format(idx, 1 + idx % 28, 1 + idx % 12, idx % 60, Messages[idx % len(Messages)].format(idx)))
+
+def countLines(stream):
+    return sum(1 for _ in iter(stream.readline, ''))
+
+def countCommits(stream):
+    return sum(1 for _ in Commit.iterCommitHistory(iter(stream.readline, '')))
+
+def measure(openStream, count):
+    start = time.perf_counter()
+    with openStream() as stream:
+        result = count(stream)
+    return result, time.perf_counter() - start
+
+def measurePeakMemory(openStream):
+    tracemalloc.start()
+    with openStream() as stream:
+        countLines(stream)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+def pipe(command, path):
+    def openStream():
+        process = subprocess.Popen(command + [path], stdout=subprocess.PIPE)
+        return io.TextIOWrapper(process.stdout, encoding='utf-8')
+    return openStream
+
+def native(path):
+    return lambda: Commit.openCommitHistory(path)
+
+def report(name, reader, size, openStream, expected):
+    lines, readTime = measure(openStream, countLines)
+    commits, parseTime = measure(openStream, countCommits)
+    peak = measurePeakMemory(openStream)
+    print(Row.format(name, reader, size, readTime, parseTime, peak / 2**20))
+    assert (lines, commits) == expected
+
+Header = '{0:<6} {1:<8} {2:>8} {3:>10} {4:>10} {5:>12}'
+Row = '{0:<6} {1:<8} {2:>8.1f} {3:>10.2f} {4:>10.2f} {5:>12.2f}'
+
+def main():
+    commits = 50000
+    for arg in sys.argv[1:]:
+        if arg.startswith('--commits='):
+            commits = int(arg.split('=', 1)[1])
+    tmpDir = tempfile.mkdtemp()
+    try:
+        plainPath = os.path.join(tmpDir, 'history.txt')
+        generateHistory(plainPath, commits)
+        print('{0} commits, {1:.1f} MiB uncompressed'.format(commits, os.path.getsize(plainPath) / 2**20))
+        print(Header.format('format', 'reader', 'MiB', 'read s', 'parse s', 'peak MiB'))
+        with open(plainPath, 'r', encoding='utf-8') as f:
+            lines = countLines(f)
+        expected = (lines, commits)
+        report('plain', 'native', os.path.getsize(plainPath) / 2**20, native(plainPath), expected)
+        for name, opener, command in Formats:
+            path = plainPath + '.' + name
+            with open(plainPath, 'rb') as src, opener(path, 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            size = os.path.getsize(path) / 2**20
+            if shutil.which(command[0]):
+                report(name, command[0], size, pipe(command, path), expected)
+            report(name, 'native', size, native(path), expected)
+    finally:
+        shutil.rmtree(tmpDir)
+
+if __name__ == '__main__':
+    main()
@@ -58,6 +58,7 @@ setup(
     install_requires = ['docopt', 'semver', 'mistletoe'],
     extras_require = {
        'test': ['coverage', 'pytest', 'pytest-cov'],
+       'numpy': ['numpy'],
     },
     entry_points = {
         'console_scripts': [
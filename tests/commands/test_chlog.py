@@ -3,6 +3,7 @@
 from subprocess import PIPE, Popen as popen
 from unittest import TestCase
 import os
+import tempfile
 import semver
 
 class TestChangelog(TestCase):
@@ -32,4 +33,26 @@ class TestChangelog(TestCase):
             self.assertTrue(changelog.find("## v2.0.0") > 0)
             self.assertTrue(changelog.find("## v1.0.0") > 0)
         except ValueError as e:
-            self.fail('autoversion chlog did not return a valid changelog: '+e.__str__())
\ No newline at end of file
+            self.fail('autoversion chlog did not return a valid changelog: '+e.__str__())
+
+    def test_check_changelog(self):
+        """Tests 'autoversion chlog --check' subcommand."""
+        with tempfile.TemporaryDirectory() as tmpDir:
+            changelogFile = os.path.join(tmpDir, 'CHANGELOG.md')
+            popen(['autoversion', 'chlog', '--chlog_file='+changelogFile,
+            '--commit_hist='+self.CommitHistoryFile], stdout=PIPE).communicate()
+            process = popen(['autoversion', 'chlog', '--check', '--chlog_file='+changelogFile,
+            '--commit_hist='+self.CommitHistoryFile], stdout=PIPE)
+            output = process.communicate()[0]
+            self.assertEqual(process.returncode, 0)
+            self.assertEqual(output.decode('utf-8'), '')
+
+            with open(changelogFile, 'r') as f:
+                changelogMd = f.read()
+            with open(changelogFile, 'w') as f:
+                f.write(changelogMd.replace('## v4.1.1', '## v4.1.2', 1))
+            process = popen(['autoversion', 'chlog', '--check', '--chlog_file='+changelogFile,
+            '--commit_hist='+self.CommitHistoryFile], stdout=PIPE)
+            output = process.communicate()[0]
+            self.assertEqual(process.returncode, 1)
+            self.assertEqual(output.decode('utf-8').splitlines(), ['missing: v4.1.1'])
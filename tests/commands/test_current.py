@@ -3,6 +3,9 @@
 from subprocess import PIPE, Popen as popen
 from unittest import TestCase
 import os
+import sys
+import json
+import gzip
 import semver
 
 class TestCurrent(TestCase):
@@ -52,4 +55,38 @@ class TestCurrent(TestCase):
         except ValueError as e:
             self.assertIsNotNone(e)
 
+    def test_current_channels(self):
+        output = popen(['autoversion', 'current',
+        '--last='+self.LastVersionFull,
+        '--channels',
+        '--commit_hist='+self.LogFile], stdout=PIPE).communicate()[0]
+        channels = json.loads(output.decode('utf-8'))
+        self.assertEqual(channels['release'], '7.1.1')
+        self.assertEqual(channels['dev'], '7.1.2-dev.0')
+        self.assertTrue('rc' not in channels)
+        self.assertEqual(channels['build'], '7.1.1+14.202209061545')
+
+    def test_current_dedupe(self):
+        with open(self.LogFile, 'rb') as f:
+            history = f.read()
+        output = popen(['autoversion', 'current',
+        '--last='+self.LastVersionInitial,
+        '--dedupe', '-'], stdin=PIPE, stdout=PIPE).communicate(history + b'\n' + history)[0]
+        self.assertEqual(output.decode('utf-8').strip(), '4.1.1')
+
+    def test_current_compressed_stdin(self):
+        with open(self.LogFile, 'rb') as f:
+            history = gzip.compress(f.read())
+        output = popen(['autoversion', 'current',
+        '--last='+self.LastVersionInitial, '-'], stdin=PIPE, stdout=PIPE).communicate(history)[0]
+        self.assertEqual(output.decode('utf-8').strip(), '4.1.1')
 
+    def test_current_plastic(self):
+        """Tests 'autoversion current' reading a PlasticSCM branch."""
+        environ = dict(os.environ, AUTOVERSION_CM='"{0}" "{1}"'.format(sys.executable, os.path.join(self.dir_path, '..', 'res', 'fake_cm.py')))
+        output = popen(['autoversion', 'current', '--last='+self.LastVersionInitial,
+        '--plastic=/main'], stdout=PIPE, env=environ).communicate()[0]
+        self.assertEqual(output.decode('utf-8').strip(), '4.1.1')
+        output = popen(['autoversion', 'current', '--last=4.0.0',
+        '--plastic=/main', '--since=12'], stdout=PIPE, env=environ).communicate()[0]
+        self.assertEqual(output.decode('utf-8').strip(), '4.1.1')
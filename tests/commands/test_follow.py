@@ -0,0 +1,76 @@
+"""Tests 'autoversion current --follow'."""
+
+from subprocess import PIPE, Popen as popen
+from unittest import TestCase
+from threading import Thread
+from queue import Queue
+import os
+import time
+import tempfile
+
+class TestFollow(TestCase):
+    """Tests 'autoversion current --follow'."""
+    LastVersionInitial = '0.0.1'
+    ReadTimeout = 10
+
+    def readLines(self, stream, lines):
+        for line in iter(stream.readline, b''):
+            lines.put(line.decode('utf-8').strip())
+
+    def test_follow_idle_flush(self):
+        """Tests a version is printed for each commit while the input stays open."""
+        process = popen(['autoversion', 'current', '--last='+self.LastVersionInitial,
+            '--follow', '--idle=0.1', '-'], stdin=PIPE, stdout=PIPE)
+        lines = Queue()
+        Thread(target=self.readLines, args=(process.stdout, lines), daemon=True).start()
+        try:
+            process.stdin.write(b'2 9/5/2022 5:57:31 PM feat: add get plugin version function\n')
+            process.stdin.flush()
+            self.assertEqual(lines.get(timeout=self.ReadTimeout), '2 0.1.0')
+            process.stdin.write(b'7 9/5/2022 6:13:42 PM fix: version numbers as integers\n\nwith a body\n')
+            process.stdin.flush()
+            self.assertEqual(lines.get(timeout=self.ReadTimeout), '7 0.1.1')
+            process.stdin.write(b'12 9/6/2022 3:44:42 PM docs: correct spelling of CHANGELOG\n')
+        finally:
+            process.stdin.close()
+        self.assertEqual(lines.get(timeout=self.ReadTimeout), '12 0.1.1')
+        process.wait(timeout=self.ReadTimeout)
+
+    def test_follow_terminator(self):
+        """Tests a terminator line completes a commit without waiting."""
+        process = popen(['autoversion', 'current', '--last='+self.LastVersionInitial,
+            '--follow', '--terminator=%%', '-'], stdin=PIPE, stdout=PIPE)
+        lines = Queue()
+        Thread(target=self.readLines, args=(process.stdout, lines), daemon=True).start()
+        try:
+            process.stdin.write(b'8 9/6/2022 3:43:00 PM feat!: send an email to the customer when a product is shipped\n%%\n')
+            process.stdin.flush()
+            self.assertEqual(lines.get(timeout=self.ReadTimeout), '8 1.0.0')
+        finally:
+            process.stdin.close()
+        process.wait(timeout=self.ReadTimeout)
+
+    def test_follow_not_forwarded(self):
+        """Tests followed histories are read locally when a server is configured."""
+        with tempfile.TemporaryDirectory() as tmpDir:
+            socketPath = os.path.join(tmpDir, 'autoversion.sock')
+            server = popen(['autoversion', 'serve', '--socket='+socketPath])
+            try:
+                for _ in range(100):
+                    if os.path.exists(socketPath):
+                        break
+                    time.sleep(0.05)
+                process = popen(['autoversion', 'current', '--last='+self.LastVersionInitial,
+                    '--follow', '--terminator=%%', '-'], stdin=PIPE, stdout=PIPE, env=dict(os.environ, AUTOVERSION_SOCKET=socketPath))
+                lines = Queue()
+                Thread(target=self.readLines, args=(process.stdout, lines), daemon=True).start()
+                try:
+                    process.stdin.write(b'2 9/5/2022 5:57:31 PM feat: add get plugin version function\n%%\n')
+                    process.stdin.flush()
+                    self.assertEqual(lines.get(timeout=self.ReadTimeout), '2 0.1.0')
+                finally:
+                    process.stdin.close()
+                process.wait(timeout=self.ReadTimeout)
+            finally:
+                server.terminate()
+                server.wait(timeout=self.ReadTimeout)
@@ -3,6 +3,7 @@
 from subprocess import PIPE, Popen as popen
 from unittest import TestCase
 import os
+import tempfile
 import semver
 
 class TestRelease(TestCase):
@@ -42,4 +43,18 @@ class TestRelease(TestCase):
                 self.assertTrue(len(changelog.splitlines()) == 1)
             except ValueError as e:
                 self.fail('autoversion release did not return a valid release note: '+e.__str__())
-        os.remove(emptyFile)
\ No newline at end of file
+        os.remove(emptyFile)
+
+    def test_release_template(self):
+        """Tests 'autoversion release' subcommand with a template."""
+        with tempfile.TemporaryDirectory() as tmpDir:
+            templateFile = os.path.join(tmpDir, 'template.json')
+            with open(templateFile, 'w') as f:
+                f.write('{"version": "Release {version}\\n\\n", "section": "{title}:\\n{entries}\\n", "entry": "- {summary}\\n"}')
+            output = popen(['autoversion', 'release',
+            '--current='+self.LastVersionRelease, '--template='+templateFile,
+            '--commit_hist='+self.CommitHistoryFile], stdout=PIPE).communicate()[0]
+        lines = output.decode('utf-8').splitlines()
+        self.assertEqual(lines[0], 'Release '+self.LastVersionRelease)
+        self.assertEqual(lines[2], 'BREAKING CHANGES:')
+        self.assertTrue(lines[3].startswith('- '))
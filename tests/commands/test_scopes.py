@@ -0,0 +1,34 @@
+"""Tests 'autoversion scopes' subcommand and scope filters."""
+
+from subprocess import PIPE, Popen as popen
+from unittest import TestCase
+import os
+
+class TestScopes(TestCase):
+    """Tests 'autoversion scopes' subcommand and scope filters."""
+    LastVersionInitial = '0.0.1'
+
+    dir_path = os.path.dirname(os.path.realpath(__file__))
+    LogFile = os.path.join(dir_path, '..', 'res', 'plastic.txt')
+
+    def test_scopes(self):
+        """Tests listing scopes with their commit counts."""
+        output = popen(['autoversion', 'scopes', '--commit_hist='+self.LogFile], stdout=PIPE).communicate()[0]
+        self.assertEqual(output.decode('utf-8').splitlines(), ['api 1', 'lang 1'])
+
+    def test_current_scope(self):
+        """Tests 'autoversion current' with a scope filter."""
+        output = popen(['autoversion', 'current', '--last='+self.LastVersionInitial, '--scope=api',
+        '--commit_hist='+self.LogFile], stdout=PIPE).communicate()[0]
+        self.assertEqual(output.decode('utf-8').strip(), '1.0.0')
+        output = popen(['autoversion', 'current', '--last='+self.LastVersionInitial, '--scope=api,lang',
+        '--commit_hist='+self.LogFile], stdout=PIPE).communicate()[0]
+        self.assertEqual(output.decode('utf-8').strip(), '1.1.0')
+
+    def test_release_scope(self):
+        """Tests 'autoversion release' with a scope filter."""
+        output = popen(['autoversion', 'release', '--current=1.0.0', '--scope=lang',
+        '--commit_hist='+self.LogFile], stdout=PIPE).communicate()[0]
+        notes = output.decode('utf-8')
+        self.assertTrue(notes.find('* **lang:** add Polish language') > 0)
+        self.assertEqual(notes.find('**api:**'), -1)
@@ -0,0 +1,93 @@
+"""Tests 'autoversion serve' subcommand."""
+
+from subprocess import PIPE, Popen as popen
+from unittest import TestCase
+import os
+import time
+import json
+import signal
+import gzip
+import base64
+import tempfile
+
+class TestServe(TestCase):
+    """Tests 'autoversion serve' subcommand."""
+    LastVersionInitial = '0.0.1'
+    LastVersionRelease = '2.3.7'
+
+    dir_path = os.path.dirname(os.path.realpath(__file__))
+    LogFile = os.path.join(dir_path, '..', 'res', 'plastic.txt')
+
+    def request(self, requestId, argv, stdin=None):
+        params = {'argv': argv, 'cwd': self.dir_path}
+        if stdin is not None:
+            params['stdin'] = stdin
+        return json.dumps({'jsonrpc': '2.0', 'id': requestId, 'method': 'run', 'params': params}) + '\n'
+
+    def test_serve_stdio(self):
+        """Tests serving several requests from one process over stdin/stdout."""
+        with open(self.LogFile, 'r') as f:
+            history = f.read()
+        requests = self.request(1, ['current', '--last='+self.LastVersionInitial, '--commit_hist='+self.LogFile]) + \
+            self.request(2, ['current', '--last='+self.LastVersionInitial, '--commit_hist='+self.LogFile]) + \
+            self.request(3, ['current', '--last='+self.LastVersionRelease, '-'], history) + \
+            self.request(4, ['current', '--last=invalid-version', '--commit_hist='+self.LogFile]) + \
+            'not json\n'
+        output = popen(['autoversion', 'serve'], stdin=PIPE, stdout=PIPE).communicate(requests.encode('utf-8'))[0]
+        responses = [json.loads(line) for line in output.decode('utf-8').splitlines()]
+        self.assertEqual(len(responses), 5)
+        self.assertEqual([r['id'] for r in responses], [1, 2, 3, 4, None])
+        self.assertEqual(responses[0]['result']['output'].strip(), '4.1.1')
+        self.assertEqual(responses[1]['result']['output'].strip(), '4.1.1')
+        self.assertEqual(responses[2]['result']['output'].strip(), '6.1.1')
+        self.assertEqual(responses[3]['result']['status'], 1)
+        self.assertIsNotNone(responses[3]['result']['error'])
+        self.assertEqual(responses[4]['error']['code'], -32700)
+
+    def test_serve_binary_stdin(self):
+        """Tests serving a compressed history sent as base64 encoded bytes."""
+        with open(self.LogFile, 'rb') as f:
+            history = base64.b64encode(gzip.compress(f.read())).decode('ascii')
+        request = json.dumps({'jsonrpc': '2.0', 'id': 1, 'method': 'run',
+            'params': {'argv': ['current', '--last='+self.LastVersionInitial, '-'], 'stdin_b64': history}}) + '\n'
+        output = popen(['autoversion', 'serve'], stdin=PIPE, stdout=PIPE).communicate(request.encode('utf-8'))[0]
+        self.assertEqual(json.loads(output.decode('utf-8'))['result']['output'], '4.1.1\n')
+
+    def test_serve_socket_keeps_other_files(self):
+        """Tests that serving on the path of a regular file fails without removing the file."""
+        with tempfile.TemporaryDirectory() as tmpDir:
+            path = os.path.join(tmpDir, 'keep.txt')
+            with open(path, 'w') as f:
+                f.write('keep')
+            process = popen(['autoversion', 'serve', '--socket='+path], stdout=PIPE, stderr=PIPE)
+            errors = process.communicate()[1]
+            self.assertNotEqual(process.returncode, 0)
+            self.assertTrue(errors.decode('utf-8').find('not a socket') > 0)
+            with open(path, 'r') as f:
+                self.assertEqual(f.read(), 'keep')
+
+    def test_serve_invalid_params(self):
+        """Tests that requests with invalid params get an error and the server goes on."""
+        requests = json.dumps({'jsonrpc': '2.0', 'id': 1, 'method': 'run', 'params': ['x']}) + '\n' + \
+            json.dumps({'jsonrpc': '2.0', 'id': 2, 'method': 'run', 'params': {'argv': ['current'], 'stdin_b64': 'not base64!'}}) + '\n' + \
+            json.dumps({'jsonrpc': '2.0', 'id': 3, 'method': 'run', 'params': {'argv': 'current'}}) + '\n' + \
+            self.request(4, ['current', '--last='+self.LastVersionInitial, '--commit_hist='+self.LogFile])
+        output = popen(['autoversion', 'serve'], stdin=PIPE, stdout=PIPE).communicate(requests.encode('utf-8'))[0]
+        responses = [json.loads(line) for line in output.decode('utf-8').splitlines()]
+        self.assertEqual([r['id'] for r in responses], [1, 2, 3, 4])
+        self.assertEqual([r['error']['code'] for r in responses[:3]], [-32602] * 3)
+        self.assertEqual(responses[3]['result']['output'].strip(), '4.1.1')
+
+    def test_serve_socket_sigterm(self):
+        """Tests that the socket file is removed when the server is terminated."""
+        with tempfile.TemporaryDirectory() as tmpDir:
+            path = os.path.join(tmpDir, 'autoversion.sock')
+            process = popen(['autoversion', 'serve', '--socket='+path], stdout=PIPE, stderr=PIPE)
+            for _ in range(100):
+                if os.path.exists(path):
+                    break
+                time.sleep(0.05)
+            self.assertTrue(os.path.exists(path))
+            process.send_signal(signal.SIGTERM)
+            process.communicate(timeout=10)
+            self.assertFalse(os.path.lexists(path))
@@ -0,0 +1,38 @@
+"""Tests 'autoversion timeline' subcommand."""
+
+from subprocess import PIPE, Popen as popen
+from unittest import TestCase
+import os
+import tempfile
+
+class TestTimeline(TestCase):
+    """Tests 'autoversion timeline' subcommand."""
+    LastVersionInitial = '0.0.1'
+
+    dir_path = os.path.dirname(os.path.realpath(__file__))
+    LogFile = os.path.join(dir_path, '..', 'res', 'plastic.txt')
+
+    def test_timeline(self):
+        """Tests printing the version of every commit."""
+        output = popen(['autoversion', 'timeline',
+        '--last='+self.LastVersionInitial,
+        '--commit_hist='+self.LogFile], stdout=PIPE).communicate()[0]
+        lines = output.decode('utf-8').strip().splitlines()
+        self.assertEqual(len(lines), 10)
+        self.assertEqual(lines[0], '2 0.1.0')
+        self.assertEqual(lines[-1], '14 4.1.1')
+
+    def test_timeline_index_batch_query(self):
+        """Tests saving the index and querying it from stdin."""
+        with tempfile.TemporaryDirectory() as tmpDir:
+            indexFile = os.path.join(tmpDir, 'timeline.json')
+            output = popen(['autoversion', 'timeline',
+            '--last='+self.LastVersionInitial,
+            '--save='+indexFile,
+            '--commit_hist='+self.LogFile], stdout=PIPE).communicate()[0]
+            self.assertEqual(output.decode('utf-8').strip(), '4.1.1')
+
+            output = popen(['autoversion', 'timeline',
+            '--index='+indexFile, '-'], stdin=PIPE, stdout=PIPE).communicate(b'9\n2022-09-06 15:44:00\nunknown\n')[0]
+            lines = output.decode('utf-8').strip().splitlines()
+            self.assertEqual(lines, ['9 2.0.0', '2022-09-06 15:44:00 3.0.0', 'unknown -'])
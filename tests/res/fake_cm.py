@@ -0,0 +1,48 @@
+"""Stands in for the PlasticSCM `cm` client in tests.
+
+Answers `cm find changeset "where branch='/main' and changesetid > N order by changesetid asc limit P"`
+from the changesets of plastic.txt (branch /main). Every call is appended to the file in FAKE_CM_LOG.
+"""
+
+import os
+import re
+import sys
+import datetime
+
+HistoryFile = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'plastic.txt')
+HeaderRegex = re.compile(r'^(?P<id>\d+) (?P<date>\d{1,2}/\d{1,2}/\d{4} \d{1,2}:\d{2}:\d{2} (A|P)M) (?P<comment>.*)$')
+QueryRegex = re.compile(r"^where branch='(?P<branch>[^']+)' and changesetid > (?P<since>\d+) order by changesetid asc limit (?P<limit>\d+)$")
+
+def readChangesets():
+    changesets = []
+    with open(HistoryFile, 'r') as f:
+        for line in f.read().splitlines():
+            match = HeaderRegex.match(line)
+            if match:
+                date = datetime.datetime.strptime(match.group('date'), '%m/%d/%Y %I:%M:%S %p')
+                changesets.append([int(match.group('id')), date, match.group('comment')])
+            elif changesets:
+                changesets[-1][2] += '\n' + line
+    return changesets
+
+def main(args):
+    if os.environ.get('FAKE_CM_LOG'):
+        with open(os.environ['FAKE_CM_LOG'], 'a') as f:
+            f.write(' '.join(args[:3]) + '\n')
+    options = dict(arg[2:].split('=', 1) for arg in args[3:] if '=' in arg)
+    match = QueryRegex.match(args[2]) if args[:2] == ['find', 'changeset'] and len(args) > 2 else None
+    if match is None or options.get('dateformat') != 'yyyy-MM-ddTHH:mm:ss':
+        sys.stderr.write('unsupported command: {0}\n'.format(args))
+        return 1
+    if match.group('branch') != '/main':
+        sys.stderr.write("The branch '{0}' does not exist.\n".format(match.group('branch')))
+        return 1
+    changesets = [c for c in readChangesets() if c[0] > int(match.group('since'))][:int(match.group('limit'))]
+    for changesetId, date, comment in changesets:
+        record = options['format'].replace('{changesetid}', str(changesetId))
+        record = record.replace('{date}', date.strftime('%Y-%m-%dT%H:%M:%S')).replace('{comment}', comment)
+        sys.stdout.write(record + '\n')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,76 @@
+"""Tests for the in-process API"""
+
+import io
+import gzip
+import os
+import unittest
+import semver
+import autoversion
+from autoversion.commands.base import Commit
+
+class TestApi(unittest.TestCase):
+    """Tests for the in-process API"""
+    LastVersionInitial = '0.0.1'
+    LastVersionRelease = '2.3.7'
+
+    dir_path = os.path.dirname(os.path.realpath(__file__))
+    LogFile = os.path.join(dir_path, 'res', 'plastic.txt')
+    ChangelogFile = os.path.join(dir_path, 'res', 'CHANGELOG.md')
+
+    def readHistory(self):
+        with open(self.LogFile, 'r') as f:
+            return f.read()
+
+    def test_compute_version_from_any_history(self):
+        """Tests computing the version from text, streams, lines and parsed commits."""
+        history = self.readHistory()
+        expected = semver.VersionInfo.parse('4.1.1')
+        self.assertEqual(autoversion.compute_version(history, last=self.LastVersionInitial), expected)
+        self.assertEqual(autoversion.compute_version(io.StringIO(history), last='v' + self.LastVersionInitial), expected)
+        self.assertEqual(autoversion.compute_version(history.splitlines(), last=self.LastVersionInitial), expected)
+        commits = Commit.parseCommitHistory(io.StringIO(history))
+        self.assertEqual(autoversion.compute_version(commits, last=semver.VersionInfo.parse(self.LastVersionInitial)), expected)
+        self.assertEqual(autoversion.compute_version([], last=self.LastVersionRelease), semver.VersionInfo.parse(self.LastVersionRelease))
+
+    def test_compute_channels(self):
+        channels = autoversion.compute_channels(self.readHistory(), last=self.LastVersionInitial)
+        self.assertEqual(str(channels['release']), '4.1.1')
+        self.assertEqual(str(channels['build']), '4.1.1+14.202209061545')
+
+    def test_generate_changelog(self):
+        """Tests generating and updating changelogs in process."""
+        result = autoversion.generate_changelog(self.readHistory())
+        self.assertEqual(result['version'], semver.VersionInfo.parse('4.1.1'))
+        self.assertTrue(result['changelog'].startswith('# Changelog'))
+        self.assertTrue(result['changelog'].find('## v4.1.1 (2022-09-06)') > 0)
+
+        with open(self.ChangelogFile, 'r') as f:
+            stream = io.StringIO()
+            result = autoversion.generate_changelog(self.readHistory(), changelog=f, stream=stream)
+        self.assertEqual(result['version'], semver.VersionInfo.parse('7.1.1'))
+        self.assertIsNone(result['changelog'])
+        self.assertTrue(stream.getvalue().find('## v7.1.1 (2022-09-06)') > 0)
+
+    def test_generate_release_notes(self):
+        notes = autoversion.generate_release_notes(self.readHistory(), self.LastVersionRelease)
+        self.assertTrue(notes.startswith('## v2.3.7 (2022-09-06)'))
+        self.assertEqual(len(autoversion.generate_release_notes([], self.LastVersionRelease).strip().splitlines()), 1)
+        notes = autoversion.generate_release_notes(self.readHistory(), self.LastVersionRelease, template={'version': '# {version}\n\n'})
+        self.assertTrue(notes.startswith('# 2.3.7\n\n### BREAKING CHANGES'))
+
+    def test_run_command_line(self):
+        """Tests running command lines without a subprocess."""
+        result = autoversion.run(['current', '--last=' + self.LastVersionInitial, '-'], stdin=self.readHistory())
+        self.assertEqual(result, {'output': '4.1.1\n', 'status': 0, 'error': None})
+        result = autoversion.run(['current', '--last=invalid-version', '--commit_hist=' + self.LogFile])
+        self.assertEqual(result['status'], 1)
+        self.assertEqual(autoversion.run(['--version'])['output'].strip(), autoversion.__version__)
+        self.assertEqual(autoversion.run(['unknown'])['status'], 1)
+
+    def test_run_binary_stdin(self):
+        """Tests running command lines on bytes read from stdin, compressed or in another encoding."""
+        history = self.readHistory().encode('utf-8')
+        result = autoversion.run(['current', '--last=' + self.LastVersionInitial, '-'], stdin=gzip.compress(history))
+        self.assertEqual(result['output'], '4.1.1\n')
+        result = autoversion.run(['release', '--current=1.0.0', '-'], stdin='1 9/5/2022 5:57:31 PM feat: caf\u00e9 support\n'.encode('cp1252'), stdin_encoding='cp1252')
+        self.assertTrue(result['output'].find('* caf\u00e9 support') > 0)
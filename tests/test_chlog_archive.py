@@ -0,0 +1,94 @@
+"""Tests for changelog archiving"""
+
+import os
+import datetime
+import shutil
+import tempfile
+import unittest
+from autoversion.commands.chlog import ChangelogGenerator, ChangelogArchive
+from autoversion.commands.base import Commit
+
+class TestChangelogArchive(unittest.TestCase):
+    """Tests for changelog archiving"""
+
+    dir_path = os.path.dirname(os.path.realpath(__file__))
+    ChangelogFile = os.path.join(dir_path, 'res', 'CHANGELOG.md')
+
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+        self.changelogFile = os.path.join(self.tmpDir, 'CHANGELOG.md')
+        shutil.copyfile(self.ChangelogFile, self.changelogFile)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def read(self, path):
+        with open(path, 'r') as f:
+            return f.read().splitlines()
+
+    def versions(self, path):
+        return [version for version, _, _ in ChangelogGenerator.scanSections(self.read(path))]
+
+    def test_scan_sections(self):
+        """Tests finding version sections from their headings."""
+        lines = self.read(self.ChangelogFile)
+        sections = ChangelogGenerator.scanSections(lines)
+        self.assertEqual(len(sections), 81)
+        self.assertEqual(sections[0][0], '3.1.25')
+        self.assertEqual(lines[sections[0][1]][:11], '## [3.1.25]')
+        self.assertEqual(sections[21][0], '3.1.0') # level 1 heading
+        self.assertEqual(sections[-1][0], '0.1.0-alpha.1')
+        self.assertEqual(sections[-1][2], len(lines))
+
+    def test_archive_by_major(self):
+        """Tests moving all but the latest major version into archives."""
+        originalVersions = self.versions(self.changelogFile)
+        archived = ChangelogArchive(self.changelogFile, 'major', 1).archive()
+        self.assertEqual([os.path.basename(path) for path in archived], ['CHANGELOG-v2.md', 'CHANGELOG-v1.md', 'CHANGELOG-v0.md'])
+
+        activeVersions = self.versions(self.changelogFile)
+        self.assertTrue(all(version.startswith('3.') for version in activeVersions))
+        archivedVersions = []
+        for path in archived:
+            archivedVersions += self.versions(path)
+        self.assertEqual(activeVersions + archivedVersions, originalVersions)
+        self.assertTrue('* [v2](CHANGELOG-v2.md)' in self.read(self.changelogFile))
+        # nothing more to archive
+        self.assertEqual(ChangelogArchive(self.changelogFile, 'major', 1).archive(), [])
+
+    def test_archive_by_year_then_update(self):
+        """Tests updating an archived changelog only reads the active file and archives again."""
+        ChangelogArchive(self.changelogFile, 'year', 2).archive()
+        self.assertEqual(self.versions(self.changelogFile)[-1], '3.1.20')
+        self.assertTrue(os.path.isfile(os.path.join(self.tmpDir, 'CHANGELOG-2019.md')))
+
+        generator = ChangelogGenerator.fromChangelog(self.changelogFile)
+        self.assertEqual(str(generator.lastVersion), '3.1.25')
+        commits = [Commit.parseCommit('feat: add archives')]
+        commits[0].date = datetime.datetime(2023, 1, 2)
+        with open(self.changelogFile, 'w') as f:
+            generator.writeChangelog(f, commits)
+        archived = ChangelogArchive(self.changelogFile, 'year', 2).archive()
+        self.assertEqual([os.path.basename(path) for path in archived], ['CHANGELOG-2020.md'])
+        self.assertEqual(self.versions(self.changelogFile), ['3.2.0', '3.1.25'])
+        self.assertEqual(self.versions(archived[0]), ['3.1.24', '3.1.23', '3.1.22', '3.1.21', '3.1.20'])
+
+        links = [line for line in self.read(self.changelogFile) if line.startswith('* [')]
+        self.assertEqual(links[:2], ['* [2020](CHANGELOG-2020.md)', '* [2019](CHANGELOG-2019.md)'])
+
+    def test_invalid_archive_options(self):
+        with self.assertRaises(ValueError):
+            ChangelogArchive(self.changelogFile, 'month')
+        with self.assertRaises(ValueError):
+            ChangelogArchive(self.changelogFile, 'major', 0)
+
+    def test_archive_after_interrupted_archive(self):
+        """Tests archiving again after the archives were written but not the changelog."""
+        originalVersions = self.versions(self.changelogFile)
+        archived = ChangelogArchive(self.changelogFile, 'major', 1).archive()
+        shutil.copyfile(self.ChangelogFile, self.changelogFile) # as if replacing the changelog failed
+        self.assertEqual(ChangelogArchive(self.changelogFile, 'major', 1).archive(), archived)
+        archivedVersions = []
+        for path in archived:
+            archivedVersions += self.versions(path)
+        self.assertEqual(self.versions(self.changelogFile) + archivedVersions, originalVersions)
@@ -0,0 +1,67 @@
+"""Tests for changelog verification"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import semver
+from autoversion.commands.chlog import ChangelogGenerator, ChangelogArchive, ChangelogCheck
+from autoversion.commands.base import Commit
+
+class TestChangelogCheck(unittest.TestCase):
+    """Tests for changelog verification"""
+
+    dir_path = os.path.dirname(os.path.realpath(__file__))
+    CommitHistoryFile = os.path.join(dir_path, 'res', 'plastic.txt')
+    LastVersion = semver.VersionInfo.parse('0.0.0')
+
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+        self.changelogFile = os.path.join(self.tmpDir, 'CHANGELOG.md')
+        with open(self.CommitHistoryFile, 'r') as f:
+            self.commits = Commit.parseCommitHistory(f)
+        generator = ChangelogGenerator.fromChangelogMd('', self.LastVersion)
+        with open(self.changelogFile, 'w') as f:
+            generator.writeChangelog(f, self.commits)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def replace(self, old, new):
+        with open(self.changelogFile, 'r') as f:
+            changelogMd = f.read()
+        self.assertTrue(old in changelogMd)
+        with open(self.changelogFile, 'w') as f:
+            f.write(changelogMd.replace(old, new, 1))
+
+    def test_up_to_date(self):
+        """Tests that a generated changelog passes the check."""
+        self.assertEqual(ChangelogCheck(self.changelogFile).check(self.commits, self.LastVersion), [])
+
+    def test_missing_changelog(self):
+        """Tests that all versions are missing without a changelog."""
+        problems = ChangelogCheck(os.path.join(self.tmpDir, 'missing.md')).check(self.commits, self.LastVersion)
+        self.assertEqual(problems[0], ('4.1.1', 'missing'))
+        self.assertTrue(all(problem == 'missing' for _, problem in problems))
+
+    def test_changed_sections(self):
+        """Tests reporting changed and removed sections only."""
+        self.replace('## v4.1.0', '## v4.1.0-rc.1')
+        self.replace('## v4.0.0 (', '## v4.0.0 (1999-')
+        self.replace('* ', '* (edited) ')
+        problems = ChangelogCheck(self.changelogFile).check(self.commits, self.LastVersion)
+        self.assertEqual(problems, [('4.1.1', 'differs'), ('4.1.0', 'missing'), ('4.0.0', 'differs')])
+
+    def test_archived_sections(self):
+        """Tests that sections moved to archive files are checked too."""
+        ChangelogArchive(self.changelogFile, 'major', 1).archive()
+        self.assertEqual(ChangelogCheck(self.changelogFile).check(self.commits, self.LastVersion), [])
+        os.remove(os.path.join(self.tmpDir, 'CHANGELOG-v1.md'))
+        problems = ChangelogCheck(self.changelogFile).check(self.commits, self.LastVersion)
+        self.assertTrue(len(problems) > 0)
+        self.assertTrue(all(version.startswith('1.') and problem == 'missing' for version, problem in problems))
+
+    def test_digest_ignores_trailing_blank_lines(self):
+        """Tests that blank lines separating sections do not change the digest."""
+        self.assertEqual(ChangelogCheck.digest(['## v1.0.0', '', '* a']), ChangelogCheck.digest(['## v1.0.0', '', '* a', '', '']))
+        self.assertNotEqual(ChangelogCheck.digest(['## v1.0.0', '', '* a']), ChangelogCheck.digest(['## v1.0.0', '', '* b']))
@@ -1,6 +1,7 @@
 """Tests for changelog generation"""
 
 import os
+import tempfile
 import unittest
 import semver
 from autoversion.commands.chlog import ChangelogGenerator
@@ -125,4 +126,64 @@ class TestChangelogGenerator(unittest.TestCase):
         self.assertEqual(generator.currentVersion, semver.VersionInfo.parse('7.1.1'))
         self.assertTrue(changelog.startswith("# Changelog"))
         self.assertTrue(changelog.find("All notable changes to this project will be documented in this file. See [conventional commits](https://www.conventionalcommits.org/) for commit guidelines.") > 0)
-        
\ No newline at end of file
+        
+    def test_write_changelog_to_stream(self):
+        """Tests streaming the changelog produces the same text as rendering it."""
+        commits = []
+        for idx in range(1,8):
+            commits.append(Commit.parseCommit(getattr(TestParseCommit, 'commit' + str(idx))))
+        expected = ChangelogGenerator.fromChangelog(self.ChangelogFile).generateChangelog(commits)
+
+        class RecordingStream:
+            def __init__(self):
+                self.chunks = []
+            def write(self, text):
+                self.chunks.append(text)
+
+        stream = RecordingStream()
+        generator = ChangelogGenerator.fromChangelog(self.ChangelogFile)
+        generator.writeChangelog(stream, commits)
+        self.assertEqual(''.join(stream.chunks), expected)
+        self.assertEqual(generator.currentVersion, semver.VersionInfo.parse('7.1.1'))
+        # version sections are written as they are generated, newest first
+        sections = [chunk for chunk in stream.chunks if chunk.startswith('## v')]
+        self.assertEqual(sections[0], '## v7.1.1 ()')
+        self.assertEqual(sections[-1], '## v4.0.0 ()')
+
+    def test_replace_file(self):
+        """Tests that a changelog is only replaced once it's completely written."""
+        with tempfile.TemporaryDirectory() as tmpDir:
+            path = os.path.join(tmpDir, 'CHANGELOG.md')
+            with open(path, 'w') as f:
+                f.write('original')
+            os.chmod(path, 0o644)
+            with self.assertRaises(KeyboardInterrupt):
+                with ChangelogGenerator.replaceFile(path) as f:
+                    f.write('partial')
+                    raise KeyboardInterrupt()
+            with open(path, 'r') as f:
+                self.assertEqual(f.read(), 'original')
+            self.assertEqual(os.listdir(tmpDir), ['CHANGELOG.md'])
+
+            with ChangelogGenerator.replaceFile(path) as f:
+                f.write('updated')
+            with open(path, 'r') as f:
+                self.assertEqual(f.read(), 'updated')
+            self.assertEqual(os.stat(path).st_mode & 0o777, 0o644)
+            self.assertEqual(os.listdir(tmpDir), ['CHANGELOG.md'])
+
+    def test_replace_file_through_link(self):
+        """Tests that replacing a symbolic link to a changelog replaces its target and keeps the link."""
+        with tempfile.TemporaryDirectory() as tmpDir:
+            os.mkdir(os.path.join(tmpDir, 'docs'))
+            target = os.path.join(tmpDir, 'docs', 'CHANGELOG.md')
+            with open(target, 'w') as f:
+                f.write('original')
+            link = os.path.join(tmpDir, 'CHANGELOG.md')
+            os.symlink(os.path.join('docs', 'CHANGELOG.md'), link)
+            with ChangelogGenerator.replaceFile(link) as f:
+                f.write('updated')
+            self.assertTrue(os.path.islink(link))
+            with open(target, 'r') as f:
+                self.assertEqual(f.read(), 'updated')
+            self.assertEqual(sorted(os.listdir(os.path.join(tmpDir, 'docs'))), ['CHANGELOG.md'])
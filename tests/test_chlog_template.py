@@ -0,0 +1,90 @@
+"""Tests for changelog templates"""
+
+import os
+import json
+import tempfile
+import unittest
+import semver
+from autoversion.commands.chlog import ChangelogGenerator, ChangelogCheck
+from autoversion.commands.template import ChangelogTemplate, TemplatePart
+from autoversion.commands.base import Commit
+import test_parse
+
+def formatStringEntry(commit, skipBody):
+    entry = '{0}'.format(commit.summary) if skipBody or len(commit.body) == 0 else '{0}\n\n{1}\n'.format(commit.summary, commit.body)
+    if commit.scope:
+        entry = '**{0}:** {1}'.format(commit.scope, entry)
+    if commit.isBreaking and commit.footerValue:
+        entry = '{0}\n\n{1}'.format(entry, commit.footerValue)
+    return entry
+
+class TestChangelogTemplate(unittest.TestCase):
+    """Tests for changelog templates"""
+
+    dir_path = os.path.dirname(os.path.realpath(__file__))
+    CommitHistoryFile = os.path.join(dir_path, 'res', 'plastic.txt')
+
+    def test_substitution_and_conditionals(self):
+        """Tests fields, nested conditionals and escaped braces."""
+        part = TemplatePart('{{{a}}}{?a} a={a}{?b}, b={b}{/b}{/a}.', ['a', 'b'])
+        self.assertEqual(part.render(a='1', b='2'), '{1} a=1, b=2.')
+        self.assertEqual(part.render(a='1', b=''), '{1} a=1.')
+        self.assertEqual(part.render(a='', b='2'), '{}.')
+        self.assertEqual(part.names, {'a', 'b'})
+        self.assertEqual(TemplatePart('{?a}{/a}x', ['a']).render(a='1'), 'x')
+        self.assertEqual(part.renderValues(('1', '2')), part.render('1', b='2'))
+        self.assertEqual(TemplatePart('{?a}{a}{/a}', ['a']).renderValues(('',)), '')
+        self.assertEqual(TemplatePart('{a}', ['a']).renderValues(('1',)), '1')
+        self.assertEqual(TemplatePart('', []).renderValues(()), '')
+        with self.assertRaises(TypeError):
+            part.render('1', c='2')
+
+    def test_invalid_templates(self):
+        """Tests that template errors are reported when the template is compiled."""
+        for text in ['{c}', '{?a}', '{/a}', '{?a}{?b}{/a}{/b}', 'a { b', 'a } b', '{?a}{/b}']:
+            with self.assertRaises(ValueError, msg=text):
+                TemplatePart(text, ['a', 'b'])
+        with self.assertRaises(ValueError):
+            ChangelogTemplate({'footer': ''})
+
+    def test_version_heading(self):
+        """Tests that changelogs can't be written with version headings the changelog readers don't find."""
+        for text in ['# {version} ({date})\n\n', '### v{version}\n\n', '## Release {version}\n\n', '## {version}{date}\n\n']:
+            template = ChangelogTemplate({'version': text})
+            with self.assertRaises(ValueError, msg=text):
+                ChangelogGenerator.fromChangelogMd('', semver.VersionInfo.parse('0.0.0'), template=template)
+            with self.assertRaises(ValueError, msg=text):
+                ChangelogCheck('CHANGELOG.md', template)
+        for text in ['## {version}\n\n', '## [{version}] - {date}\n\n', '## v{version} ({hash})\n\n']:
+            ChangelogTemplate({'version': text}).checkVersionHeading()
+
+    def test_default_template_entries(self):
+        """Tests that the built-in template renders entries like the format strings it replaced."""
+        template = ChangelogTemplate.default()
+        for idx in range(1, 8):
+            commit = Commit.parseCommit(getattr(test_parse.TestParseCommit, 'commit{0}'.format(idx)))
+            for skipBody in [False, True]:
+                self.assertEqual(template.renderEntry(commit, skipBody), '* {0}\n'.format(formatStringEntry(commit, skipBody)))
+
+    def test_custom_template(self):
+        """Tests generating a changelog with a template file."""
+        with open(self.CommitHistoryFile, 'r') as f:
+            commits = Commit.parseCommitHistory(f)
+        with tempfile.TemporaryDirectory() as tmpDir:
+            templateFile = os.path.join(tmpDir, 'template.json')
+            with open(templateFile, 'w') as f:
+                json.dump({
+                    'header': '# Releases\n\n',
+                    'version': '## {version} - {date}\n\n',
+                    'section': '{entries}',
+                    'entry': '- {?scope}{scope}: {/scope}{type}: {summary}\n',
+                }, f)
+            template = ChangelogTemplate.fromFile(templateFile)
+        generator = ChangelogGenerator.fromChangelogMd('', semver.VersionInfo.parse('0.0.0'), template=template)
+        lines = generator.generateChangelog(commits).splitlines()
+        self.assertEqual(lines[0], '# Releases')
+        self.assertEqual(lines[2], '## 4.1.1 - 2022-09-06')
+        self.assertTrue(all(line.startswith(('#', '- ')) for line in lines if line))
+
+        notes = ChangelogGenerator.generateReleaseNotes(semver.VersionInfo.parse('1.0.0'), commits[:3], template)
+        self.assertEqual(notes[0], '## 1.0.0 - {0}'.format(commits[2].getDateStr()))
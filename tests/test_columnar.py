@@ -0,0 +1,69 @@
+"""Tests for columnar version calculation"""
+
+import sys
+import random
+import unittest
+import subprocess
+import semver
+from autoversion.commands.base import Commit
+from autoversion.commands.columnar import CommitColumns
+
+class TestCommitColumns(unittest.TestCase):
+    """Tests for columnar version calculation"""
+    LastVersions = ['0.0.0', '0.0.1', '2.3.7', '3.0.1-alpha+342.peter-dev.202209062328']
+    CommitMessages = ['feat: add feature', 'fix: fix bug', 'feat!: break api', 'chore!: drop support',
+        'docs: update readme', 'chore: cleanup', 'perf: speed up', 'Merge branch main']
+
+    def randomHistory(self, rnd, length):
+        return [Commit.parseCommit(rnd.choice(self.CommitMessages)) for _ in range(length)]
+
+    def scalarBoundaries(self, lastVersion, commits):
+        versions, counts = [], []
+        state = {'count': 0}
+        def onCommitProcessed(version, commit):
+            state['count'] += 1
+            if commit.isVersionCommit():
+                versions.append(version)
+                counts.append(state['count'])
+                state['count'] = 0
+        Commit.calculateCurrentVersion(lastVersion, commits, onCommitProcessed)
+        boundaries = [idx for idx, c in enumerate(commits) if c.isVersionCommit()]
+        return boundaries, versions, counts
+
+    def checkMatchesScalarPath(self):
+        rnd = random.Random(42)
+        for length in [0, 1, 2, 5, 50, 500]:
+            for lastVersionStr in self.LastVersions:
+                lastVersion = semver.VersionInfo.parse(lastVersionStr)
+                commits = self.randomHistory(rnd, length)
+                columns = CommitColumns.fromCommits(commits)
+                self.assertEqual(columns.calculateCurrentVersion(lastVersion), Commit.calculateCurrentVersion(lastVersion, commits))
+                boundaries, versions, counts = self.scalarBoundaries(lastVersion, commits)
+                self.assertEqual(columns.versionBoundaries().tolist(), boundaries)
+                self.assertEqual(columns.changeCounts().tolist(), counts)
+                self.assertEqual(columns.versions(lastVersion), versions)
+
+    def test_matches_scalar_path(self):
+        """Tests the columnar results (with NumPy when it is installed) equal the per-commit fold."""
+        minCommits = CommitColumns.NumpyMinCommits
+        CommitColumns.NumpyMinCommits = 0
+        try:
+            self.checkMatchesScalarPath()
+        finally:
+            CommitColumns.NumpyMinCommits = minCommits
+
+    def test_matches_scalar_path_without_numpy(self):
+        """Tests the stdlib fallback equals the per-commit fold."""
+        numpy = CommitColumns._numpy
+        CommitColumns._numpy = False
+        try:
+            self.checkMatchesScalarPath()
+        finally:
+            CommitColumns._numpy = numpy
+
+    def test_numpy_not_imported_at_startup(self):
+        """Tests that loading the commands and computing a small history's versions doesn't import NumPy."""
+        code = 'import sys; from autoversion.commands.columnar import CommitColumns; ' + \
+            'CommitColumns(bytearray([0, 1, 2])).changeCounts(); print("numpy" in sys.modules)'
+        output = subprocess.check_output([sys.executable, '-c', 'import autoversion.commands; ' + code])
+        self.assertEqual(output.decode('utf-8').strip(), 'False')
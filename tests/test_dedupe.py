@@ -0,0 +1,89 @@
+"""Tests for duplicate and revert elimination"""
+
+import io
+import unittest
+import semver
+from autoversion.commands.base import Commit
+
+class TestDeduplicateHistory(unittest.TestCase):
+    """Tests for duplicate and revert elimination"""
+
+    History = """a1b2c3d 9/5/2022 5:57:31 PM feat: add get plugin version function
+b2c3d4e 9/5/2022 6:08:45 PM Merge branch 'feature' into main
+c3d4e5f 9/5/2022 6:13:42 PM fix(api):  Version numbers as integers
+a1b2c3d 9/5/2022 5:57:31 PM feat: add get plugin version function
+d4e5f6a 9/5/2022 6:20:00 PM fix(api): version numbers as   integers
+e5f6a7b 9/6/2022 3:43:00 PM feat!: send an email to the customer when a product is shipped
+f6a7b8c 9/6/2022 3:44:00 PM revert: send an email to the customer when a product is shipped
+
+This reverts commit e5f6a7b8c9d0e1f2a3b4c5d6e7f8a9b0c1d2e3f4.
+0a1b2c3 9/6/2022 3:45:00 PM feat: add Polish language
+"""
+
+    def parse(self, history):
+        return Commit.parseCommitHistory(io.StringIO(history))
+
+    def test_unique_commits(self):
+        """Tests merges, re-imported and cherry-picked commits are skipped."""
+        commits = list(Commit.iterUniqueCommits(self.parse(self.History)))
+        self.assertEqual([c.hash for c in commits], ['a1b2c3d', 'c3d4e5f', 'e5f6a7b', 'f6a7b8c', '0a1b2c3'])
+
+    def test_same_summary_different_changes(self):
+        """Tests distinct commits with the same summary are kept, cherry-picks of them are skipped."""
+        history = """1 9/5/2022 5:57:31 PM fix: typo
+
+Fix the spelling of the config key in the readme.
+2 9/5/2022 5:58:31 PM fix: typo
+
+Fix a typo in the error message of the parser.
+3 9/5/2022 5:59:31 PM fix: typo
+
+Fix a typo in the error message  of the parser.
+
+(cherry picked from commit 2)
+"""
+        commits = Commit.deduplicateHistory(self.parse(history))
+        self.assertEqual([c.hash for c in commits], ['1', '2'])
+        self.assertEqual(Commit.calculateCurrentVersion(semver.VersionInfo.parse('1.0.0'), commits), semver.VersionInfo.parse('1.0.2'))
+
+    def test_reverted_commits_cancelled(self):
+        """Tests a revert cancels the commit it references (by a longer hash) and itself."""
+        commits = Commit.deduplicateHistory(self.parse(self.History))
+        self.assertEqual([c.hash for c in commits], ['a1b2c3d', 'c3d4e5f', '0a1b2c3'])
+        self.assertEqual(Commit.calculateCurrentVersion(semver.VersionInfo.parse('1.0.0'), commits), semver.VersionInfo.parse('1.2.0'))
+        self.assertEqual(Commit.calculateCurrentVersion(semver.VersionInfo.parse('1.0.0'), self.parse(self.History)), semver.VersionInfo.parse('2.1.0'))
+
+    def test_revert_of_revert_restores_commit(self):
+        history = """1 9/5/2022 5:57:31 PM feat: add get plugin version function
+2 9/5/2022 5:58:31 PM revert: add get plugin version function
+
+Refs: 1
+3 9/5/2022 5:59:31 PM revert: revert add get plugin version function
+
+Refs: 2
+"""
+        commits = Commit.deduplicateHistory(self.parse(history))
+        self.assertEqual([c.hash for c in commits], ['1'])
+
+    def test_unresolved_revert_kept(self):
+        history = """1 9/5/2022 5:57:31 PM revert: drop support for Node 6
+
+This reverts commit 0123abc.
+"""
+        commits = Commit.deduplicateHistory(self.parse(history))
+        self.assertEqual([c.hash for c in commits], ['1'])
+
+    def test_revert_by_shorter_hash(self):
+        """Tests a revert referencing an abbreviated hash cancels the commit, unless the prefix is ambiguous."""
+        history = self.History.replace('This reverts commit e5f6a7b8c9d0e1f2a3b4c5d6e7f8a9b0c1d2e3f4.', 'This reverts commit e5f6a.')
+        commits = Commit.deduplicateHistory(self.parse(history))
+        self.assertEqual([c.hash for c in commits], ['a1b2c3d', 'c3d4e5f', '0a1b2c3'])
+
+        history = """e5f6a11 9/5/2022 5:57:31 PM feat: add get plugin version function
+e5f6a22 9/5/2022 5:58:31 PM feat: add Polish language
+f6a7b8c 9/5/2022 5:59:31 PM revert: add Polish language
+
+This reverts commit e5f6a.
+"""
+        commits = Commit.deduplicateHistory(self.parse(history))
+        self.assertEqual([c.hash for c in commits], ['e5f6a11', 'e5f6a22', 'f6a7b8c'])
@@ -0,0 +1,53 @@
+"""Tests for the served commit history cache"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from autoversion.commands.serve import HistoryCache
+
+class TestHistoryCache(unittest.TestCase):
+    """Tests for the served commit history cache"""
+
+    dir_path = os.path.dirname(os.path.realpath(__file__))
+    LogFile = os.path.join(dir_path, 'res', 'plastic.txt')
+
+    def test_read_last_hash(self):
+        """Tests finding the last commit hash from the end of the history file."""
+        self.assertEqual(HistoryCache.readLastHash(self.LogFile), '14')
+        HistoryCache.TailBlockSize = 16 # force several backward reads
+        try:
+            self.assertEqual(HistoryCache.readLastHash(self.LogFile), '14')
+        finally:
+            HistoryCache.TailBlockSize = 4096
+
+    def test_cache_invalidated_by_new_commit(self):
+        """Tests cached histories are reused until the last commit hash changes."""
+        with tempfile.TemporaryDirectory() as tmpDir:
+            path = os.path.join(tmpDir, 'history.txt')
+            shutil.copyfile(self.LogFile, path)
+            cache = HistoryCache()
+            commits = cache.get(path)
+            self.assertEqual(len(commits), 10)
+            self.assertIs(cache.get(path), commits)
+            with open(path, 'a') as f:
+                f.write('\n15 9/7/2022 1:00:00 PM feat: add new feature\n')
+            updated = cache.get(path)
+            self.assertIsNot(updated, commits)
+            self.assertEqual(len(updated), 11)
+            self.assertEqual(updated[-1].hash, '15')
+
+    def test_cache_invalidated_by_regenerated_file(self):
+        """Tests cached histories are not reused for a file regenerated with the same last commit."""
+        with tempfile.TemporaryDirectory() as tmpDir:
+            path = os.path.join(tmpDir, 'history.txt')
+            shutil.copyfile(self.LogFile, path)
+            cache = HistoryCache()
+            commits = cache.get(path)
+            with open(self.LogFile, 'r') as f:
+                lines = f.read().splitlines()
+            with open(path, 'w') as f:
+                f.write('\n'.join(lines[3:]))
+            updated = cache.get(path)
+            self.assertEqual(updated[-1].hash, '14')
+            self.assertTrue(len(updated) < len(commits))
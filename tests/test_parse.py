@@ -3,6 +3,11 @@
 from unittest import TestCase
 from autoversion.commands import *
 import os 
+import io
+import gzip
+import lzma
+import bz2
+import tempfile
 
 class TestParseCommit(TestCase):
     """Tests conventional commit messages parsing."""
@@ -216,4 +221,47 @@ obsolete now.""")
             self.assertEqual(commits[9].footer,  """Reviewed-by: Z
 Refs: #123""")
             self.assertEqual(commits[9].footerToken, 'Refs')
-            self.assertEqual(commits[9].footerValue, '#123')
\ No newline at end of file
+            self.assertEqual(commits[9].footerValue, '#123')
+
+    def test_iter_commit_history_flush(self):
+        """Tests records are completed by flushes and terminator lines, not only by the next header."""
+        lines = ['2 9/5/2022 5:57:31 PM feat: add get plugin version function\n', None,
+            'orphan line after a flush\n',
+            '7 9/5/2022 6:13:42 PM fix: version numbers as integers\n', '\n', 'body\n', '--\n',
+            '8 9/6/2022 3:43:00 PM docs: correct spelling of CHANGELOG\n']
+        commits = []
+        for commit in Commit.iterCommitHistory(iter(lines), terminator='--'):
+            commits.append(commit)
+        self.assertEqual([c.hash for c in commits], ['2', '7', '8'])
+        self.assertEqual(commits[0].summary, 'add get plugin version function')
+        self.assertEqual(commits[1].body, 'body')
+
+    def test_parse_compressed_commit_history(self):
+        """Tests gzip, xz and bz2 histories are detected and decompressed from paths and binary streams."""
+        with open(self.LogFile, 'rb') as f:
+            history = f.read()
+        expected = [(c.hash, c.type, c.summary) for c in Commit.parseCommitHistory(io.StringIO(history.decode('utf-8')))]
+        with tempfile.TemporaryDirectory() as tmpDir:
+            for name, compress in [('gz', gzip.compress), ('xz', lzma.compress), ('bz2', bz2.compress), ('txt', bytes)]:
+                path = os.path.join(tmpDir, 'history.' + name)
+                with open(path, 'wb') as f:
+                    f.write(compress(history))
+                with Commit.openCommitHistory(path) as stream:
+                    commits = Commit.parseCommitHistory(stream)
+                self.assertEqual([(c.hash, c.type, c.summary) for c in commits], expected)
+                commits = Commit.parseCommitHistory(Commit.openCommitHistory(io.BytesIO(compress(history))))
+                self.assertEqual([(c.hash, c.type, c.summary) for c in commits], expected)
+
+    def test_parse_commit_history_encoding(self):
+        """Tests uncompressed histories are decoded with the given encoding, compressed ones as UTF-8."""
+        history = '1 9/5/2022 5:57:31 PM feat: caf\u00e9 support\n'
+        commits = Commit.parseCommitHistory(Commit.openCommitHistory(io.BytesIO(history.encode('cp1252')), 'cp1252'))
+        self.assertEqual(commits[0].summary, 'caf\u00e9 support')
+        commits = Commit.parseCommitHistory(Commit.openCommitHistory(io.BytesIO(gzip.compress(history.encode('utf-8'))), 'cp1252'))
+        self.assertEqual(commits[0].summary, 'caf\u00e9 support')
+        with tempfile.TemporaryDirectory() as tmpDir:
+            historyFile = os.path.join(tmpDir, 'history.txt')
+            with open(historyFile, 'wb') as f:
+                f.write(history.encode('utf-8'))
+            with Commit.openCommitHistory(historyFile) as f:
+                self.assertEqual(Commit.parseCommitHistory(f)[0].summary, 'caf\u00e9 support')
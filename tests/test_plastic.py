@@ -0,0 +1,63 @@
+"""Tests for the PlasticSCM history source"""
+
+import os
+import sys
+import tempfile
+import unittest
+from autoversion.commands.base import Commit
+from autoversion.commands.plastic import PlasticHistory
+
+class TestPlasticHistory(unittest.TestCase):
+    """Tests for the PlasticSCM history source"""
+
+    dir_path = os.path.dirname(os.path.realpath(__file__))
+    LogFile = os.path.join(dir_path, 'res', 'plastic.txt')
+    FakeCm = os.path.join(dir_path, 'res', 'fake_cm.py')
+
+    def setUp(self):
+        self.tmpDir = tempfile.TemporaryDirectory()
+        self.callLog = os.path.join(self.tmpDir.name, 'calls.txt')
+        self.environ = dict(os.environ)
+        os.environ['AUTOVERSION_CM'] = '"{0}" "{1}"'.format(sys.executable, self.FakeCm)
+        os.environ['FAKE_CM_LOG'] = self.callLog
+
+    def tearDown(self):
+        os.environ.clear()
+        os.environ.update(self.environ)
+        self.tmpDir.cleanup()
+
+    def calls(self):
+        with open(self.callLog, 'r') as f:
+            return f.read().splitlines()
+
+    def test_same_commits_as_history_file(self):
+        """Tests reading the same commits as from the `cm find` text output."""
+        with open(self.LogFile, 'r') as f:
+            expected = Commit.parseCommitHistory(f)
+        commits = list(PlasticHistory('/main').iterCommits())
+        self.assertEqual([(c.hash, c.date, c.type, c.scope, c.summary, c.body, c.isBreaking) for c in commits],
+            [(c.hash, c.date, c.type, c.scope, c.summary, c.body, c.isBreaking) for c in expected])
+        self.assertEqual(len(self.calls()), 1)
+
+    def test_paged_fetching(self):
+        """Tests fetching changesets in pages by changeset id range."""
+        commits = list(PlasticHistory('/main', pageSize=4).iterCommits())
+        self.assertEqual(len(commits), 10)
+        queries = [call.split(' ', 2)[2] for call in self.calls()]
+        self.assertEqual(queries, [
+            "where branch='/main' and changesetid > 0 order by changesetid asc limit 4",
+            "where branch='/main' and changesetid > 7 order by changesetid asc limit 4",
+            "where branch='/main' and changesetid > 11 order by changesetid asc limit 4",
+        ])
+
+    def test_since(self):
+        """Tests reading the changesets after a changeset id."""
+        commits = list(PlasticHistory('/main', since=10).iterCommits())
+        self.assertEqual([c.hash for c in commits], ['11', '12', '13', '14'])
+
+    def test_errors(self):
+        """Tests reporting failed queries and invalid branch names."""
+        with self.assertRaises(RuntimeError):
+            list(PlasticHistory('/missing').iterCommits())
+        with self.assertRaises(ValueError):
+            PlasticHistory("/main' or branch='/dev")
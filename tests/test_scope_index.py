@@ -0,0 +1,64 @@
+"""Tests for the commit scope index"""
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+import autoversion
+from autoversion.commands.base import Commit
+from autoversion.commands.scopes import ScopeIndex
+from autoversion.commands.serve import HistoryCache
+
+class TestScopeIndex(unittest.TestCase):
+    """Tests for the commit scope index"""
+
+    History = """1 9/6/2022 3:40:00 PM feat(api): add endpoint
+2 9/6/2022 3:41:00 PM fix(lang): fix German plural
+
+Plurals of nouns ending
+with -e were wrong.
+3 9/6/2022 3:42:00 PM docs: update readme
+4 9/6/2022 3:43:00 PM fix(api): handle empty body
+5 9/6/2022 3:44:00 PM feat(ui): add dark mode
+6 9/6/2022 3:45:00 PM feat(api)!: drop v1 endpoints
+"""
+
+    def setUp(self):
+        self.commits = Commit.parseCommitHistory(io.StringIO(self.History))
+
+    def test_counts(self):
+        """Tests counting commits per scope."""
+        index = ScopeIndex.fromCommits(self.commits)
+        self.assertEqual(index.counts(), [('api', 3), ('lang', 1), ('ui', 1)])
+        self.assertEqual(list(index.positions[None]), [2])
+
+    def test_select(self):
+        """Tests selecting the commits of scopes in history order."""
+        index = ScopeIndex.fromCommits(self.commits)
+        self.assertEqual([c.hash for c in index.select(self.commits, ['api'])], ['1', '4', '6'])
+        self.assertEqual([c.hash for c in index.select(self.commits, ['api', 'lang'])], ['1', '2', '4', '6'])
+        self.assertEqual(index.select(self.commits, ['missing']), [])
+        self.assertEqual(ScopeIndex.parseScopes(' api, lang,,api '), ['api', 'lang'])
+
+    def test_scoped_versions(self):
+        """Tests versions and release notes of scopes, with multi-line bodies kept."""
+        self.assertEqual(str(autoversion.compute_version(self.History, '1.0.0')), '2.0.0')
+        self.assertEqual(str(autoversion.compute_version(autoversion.parse_history(self.History, scopes='api'), '1.0.0')), '2.0.0')
+        self.assertEqual(str(autoversion.compute_version(autoversion.parse_history(self.History, scopes=['lang']), '1.0.0')), '1.0.1')
+        notes = autoversion.generate_release_notes(autoversion.parse_history(self.History, scopes='lang'), '1.0.1')
+        self.assertTrue(notes.find('Plurals of nouns ending\nwith -e were wrong.') > 0)
+
+    def test_cached_scope_index(self):
+        """Tests that served histories keep their scope index until they change."""
+        with tempfile.TemporaryDirectory() as tmpDir:
+            path = os.path.join(tmpDir, 'history.txt')
+            with open(path, 'w') as f:
+                f.write(self.History)
+            cache = HistoryCache()
+            index = cache.getScopeIndex(path)
+            self.assertIs(cache.getScopeIndex(path), index)
+            self.assertEqual(index.size, len(cache.get(path)))
+            with open(path, 'a') as f:
+                f.write('7 9/7/2022 1:00:00 PM fix(ui): fix contrast\n')
+            self.assertEqual(cache.getScopeIndex(path).counts(), [('api', 3), ('ui', 2), ('lang', 1)])
@@ -0,0 +1,54 @@
+"""Tests for the version timeline index"""
+
+import os
+import datetime
+import tempfile
+import unittest
+import semver
+from autoversion.commands.base import Commit
+from autoversion.commands.timeline import VersionTimeline
+
+class TestVersionTimeline(unittest.TestCase):
+    """Tests for the version timeline index"""
+    LastVersionInitial = '0.0.1'
+
+    dir_path = os.path.dirname(os.path.realpath(__file__))
+    LogFile = os.path.join(dir_path, 'res', 'plastic.txt')
+
+    def buildTimeline(self):
+        with open(self.LogFile, 'r') as f:
+            commits = Commit.parseCommitHistory(f)
+        return commits, VersionTimeline.fromHistory(semver.VersionInfo.parse(self.LastVersionInitial), commits)
+
+    def test_timeline_matches_truncated_history(self):
+        """Tests every indexed version equals the version calculated from the truncated history."""
+        commits, timeline = self.buildTimeline()
+        self.assertEqual(len(timeline), len(commits))
+        self.assertEqual(timeline.currentVersion, semver.VersionInfo.parse('4.1.1'))
+        for idx, commit in enumerate(commits):
+            expected = Commit.calculateCurrentVersion(semver.VersionInfo.parse(self.LastVersionInitial), commits[:idx + 1])
+            self.assertEqual(timeline.versionForHash(commit.hash), expected)
+        # versions are stored once per distinct version
+        self.assertEqual(len(timeline.versions), 9)
+
+    def test_timeline_query_by_date(self):
+        """Tests looking up the version of the last commit at or before a date."""
+        _, timeline = self.buildTimeline()
+        self.assertIsNone(timeline.versionForDate(datetime.datetime(2022, 9, 1)))
+        self.assertEqual(timeline.versionForDate(datetime.datetime(2022, 9, 5, 18, 10)), semver.VersionInfo.parse('0.2.0'))
+        self.assertEqual(timeline.versionForDate(datetime.datetime(2022, 9, 6, 15, 43, 40)), semver.VersionInfo.parse('2.0.0'))
+        self.assertEqual(timeline.query('2030-01-01'), semver.VersionInfo.parse('4.1.1'))
+        self.assertEqual(timeline.query('13'), semver.VersionInfo.parse('4.1.0'))
+        self.assertIsNone(timeline.query('not-a-hash'))
+
+    def test_timeline_save_and_load(self):
+        """Tests a saved timeline answers the same queries."""
+        _, timeline = self.buildTimeline()
+        with tempfile.TemporaryDirectory() as tmpDir:
+            path = os.path.join(tmpDir, 'timeline.json')
+            timeline.save(path)
+            loaded = VersionTimeline.load(path)
+        self.assertEqual(len(loaded), len(timeline))
+        for commitHash in timeline.hashes:
+            self.assertEqual(loaded.versionForHash(commitHash), timeline.versionForHash(commitHash))
+        self.assertEqual(loaded.query('2022-09-06 15:44:00'), timeline.query('2022-09-06 15:44:00'))
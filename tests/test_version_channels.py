@@ -0,0 +1,50 @@
+"""Tests for release, prerelease and build version channels"""
+
+import os
+import unittest
+import semver
+from autoversion.commands.base import Commit
+from autoversion.commands.columnar import CommitColumns
+
+class TestVersionChannels(unittest.TestCase):
+    """Tests for release, prerelease and build version channels"""
+    LastVersionFull = '3.0.1-alpha+342.peter-dev.202209062328'
+
+    dir_path = os.path.dirname(os.path.realpath(__file__))
+    LogFile = os.path.join(dir_path, 'res', 'plastic.txt')
+
+    def parseHistory(self):
+        with open(self.LogFile, 'r') as f:
+            return Commit.parseCommitHistory(f)
+
+    def test_channels_from_history(self):
+        """Tests all channels are computed in the same pass as the release version."""
+        commits = self.parseHistory()[:8] # ends with a docs commit after the last bump
+        channels = Commit.calculateVersionChannels(semver.VersionInfo.parse(self.LastVersionFull), commits)
+        self.assertEqual(str(channels['release']), '7.0.0')
+        self.assertEqual(str(channels['dev']), '7.0.1-dev.1')
+        self.assertTrue(channels['dev'] > channels['release']) # nightlies sort after the release they follow
+        self.assertEqual(str(channels['build']), '7.0.0+12.202209061544')
+        self.assertEqual(channels['release'], Commit.calculateCurrentVersion(semver.VersionInfo.parse(self.LastVersionFull), commits))
+
+    def test_channels_without_bumps(self):
+        """Tests prerelease counters when no commit bumps the version."""
+        commits = [Commit.parseCommit('docs: update readme'), Commit.parseCommit('chore: cleanup')]
+        channels = Commit.calculateVersionChannels(semver.VersionInfo.parse(self.LastVersionFull), commits)
+        self.assertEqual(str(channels['release']), '3.0.1')
+        self.assertEqual(str(channels['dev']), '3.0.2-dev.2')
+        self.assertEqual(str(channels['build']), '3.0.1') # parsed commits have neither hash nor date
+
+        channels = Commit.calculateVersionChannels(semver.VersionInfo.parse('1.0.0'), [])
+        self.assertEqual(str(channels['dev']), '1.0.1-dev.0')
+        self.assertEqual(str(channels['build']), '1.0.0')
+
+    def test_columnar_commits_since_bump(self):
+        """Tests the columnar path counts the same commits since the last bump."""
+        commits = self.parseHistory()
+        for end in range(len(commits) + 1):
+            scalar = Commit.calculateVersionChannels(semver.VersionInfo.parse('0.0.1'), commits[:end])
+            columns = CommitColumns.fromCommits(commits[:end])
+            lastCommit = commits[end - 1] if end else None
+            channels = Commit.versionChannels(columns.calculateCurrentVersion(semver.VersionInfo.parse('0.0.1')), columns.commitsSinceBump(), lastCommit)
+            self.assertEqual(channels, scalar)